@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from starlette.routing import Match
+
+
+class Saturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RouteGate:
+    """
+    Concurrency limit for one route, with a bounded FIFO of waiters.
+
+    A request waits at most max_wait seconds for a slot; when the queue is
+    full, or the wait runs out, it is rejected right away instead of piling
+    up behind work that would time out anyway.
+    """
+
+    def __init__(self, limit: int, queue_size: int, max_wait: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.service_time = 0.0  # EWMA of the time a request holds its slot
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def retry_after(self) -> int:
+        backlog = (len(self._waiters) + 1) / max(1, self.limit)
+        return max(1, math.ceil(self.service_time * backlog))
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise Saturated(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended: pass it on
+                self.release(0.0)
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            raise Saturated(self.retry_after())
+        self.admitted += 1
+
+    def release(self, held: float):
+        if held:
+            self.service_time = held if not self.service_time else 0.8 * self.service_time + 0.2 * held
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot goes straight to the next waiter; active is unchanged
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "service_time": round(self.service_time, 4),
+        }
+
+
+class AdmissionController:
+    """
+    Per-route admission control for the endpoints that call the Mistral API.
+
+    Requests whose path starts with one of guarded_prefixes (and none of
+    exempt_prefixes) go through the gate of their route template, e.g.
+    "GET /agents/{agent_id}"; everything else passes straight through.
+    """
+
+    def __init__(
+        self,
+        limit: int = 16,
+        queue_size: int = 32,
+        max_wait: float = 2.0,
+        guarded_prefixes: Tuple[str, ...] = ("/agents", "/mcp"),
+        exempt_prefixes: Tuple[str, ...] = ("/health", "/game/state"),
+    ):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.guarded_prefixes = guarded_prefixes
+        self.exempt_prefixes = exempt_prefixes
+        self.gates: Dict[str, RouteGate] = {}
+
+    def guarded(self, path: str) -> bool:
+        return path.startswith(self.guarded_prefixes) and not path.startswith(self.exempt_prefixes)
+
+    def gate(self, route: str) -> RouteGate:
+        gate = self.gates.get(route)
+        if gate is None:
+            gate = self.gates[route] = RouteGate(self.limit, self.queue_size, self.max_wait)
+        return gate
+
+    def stats(self) -> Dict[str, Any]:
+        return {route: gate.stats() for route, gate in self.gates.items()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController; rejected requests get 503 + Retry-After"""
+
+    def __init__(self, app, controller: AdmissionController, router=None):
+        self.app = app
+        self.controller = controller
+        self.router = router
+
+    def _route_key(self, scope) -> str:
+        template = scope["path"]
+        if self.router is not None:
+            for route in self.router.routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    template = getattr(route, "path", template)
+                    break
+        return f"{scope['method']} {template}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.guarded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.controller.gate(self._route_key(scope))
+        try:
+            await gate.acquire()
+        except Saturated as e:
+            await self._reject(send, e.retry_after)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(time.monotonic() - started)
+
+    @staticmethod
+    async def _reject(send, retry_after: int):
+        body = json.dumps({"detail": "Serveur saturé, réessayez plus tard"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Startup-time benchmark
+
+Measures, in fresh interpreter processes and without MISTRAL_API_KEY:
+- import time of fastapi_server and src/simple_mcp_server.py
+- time to first response: tools/list from the stdio MCP server, GET /health from the app
+
+Usage: python bench_startup.py [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(ROOT, "src")
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {path!r})
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+HEALTH_SNIPPET = """
+import asyncio, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {path!r})
+import httpx
+import fastapi_server
+
+async def first_response():
+    transport = httpx.ASGITransport(app=fastapi_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/health")
+        assert response.status_code == 200
+asyncio.run(first_response())
+print(time.perf_counter() - started)
+"""
+
+def clean_env():
+    env = dict(os.environ)
+    env.pop("MISTRAL_API_KEY", None)
+    return env
+
+def run_snippet(snippet: str, cwd: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=cwd, env=clean_env(), capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+def mcp_time_to_first_response() -> float:
+    """Spawn the stdio MCP server and time a tools/list round trip from process start"""
+    request = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}) + "\n"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, "simple_mcp_server.py")],
+        cwd=ROOT, env=clean_env(),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    try:
+        process.stdin.write(request.encode())
+        process.stdin.flush()
+        line = process.stdout.readline()
+        elapsed = time.perf_counter() - started
+        if json.loads(line).get("id") != 1:
+            raise RuntimeError(f"Unexpected response: {line!r}")
+        return elapsed
+    finally:
+        process.stdin.close()
+        process.wait(timeout=10)
+
+def report(name: str, samples):
+    print(f"{name:<40} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts per measurement")
+    args = parser.parse_args()
+
+    benchmarks = {
+        "import fastapi_server": lambda: run_snippet(
+            IMPORT_SNIPPET.format(path=ROOT, module="fastapi_server"), ROOT),
+        "import simple_mcp_server": lambda: run_snippet(
+            IMPORT_SNIPPET.format(path=SRC, module="simple_mcp_server"), SRC),
+        "fastapi: first GET /health": lambda: run_snippet(
+            HEALTH_SNIPPET.format(path=ROOT), ROOT),
+        "mcp stdio: first tools/list (process)": mcp_time_to_first_response,
+    }
+
+    print(f"🚀 Startup benchmark ({args.runs} runs, MISTRAL_API_KEY unset)")
+    print("=" * 60)
+    for name, bench in benchmarks.items():
+        report(name, [bench() for _ in range(args.runs)])
+
+if __name__ == "__main__":
+    main()
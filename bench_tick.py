@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Tick benchmark with recorded upstream traffic
+
+Record once against the real API (needs MISTRAL_API_KEY), then replay without any
+network, at the original pace or faster, to compare tick and endpoint latency
+between revisions:
+
+    python bench_tick.py --record traffic.jsonl --ticks 5
+    python bench_tick.py --replay traffic.jsonl --ticks 50 --latency-scale 0
+
+Every character acts on every tick, so runs are comparable.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+
+def report(name: str, samples):
+    if not samples:
+        print(f"{name:<28} no samples")
+        return
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<28} n {len(samples):5d}   median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"p95 {p95 * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+async def run(args):
+    import httpx
+    import fastapi_server as server
+
+    server.configure_game()
+    server.scheduler.max_interval = 1
+    server.cron_running = True
+
+    tick_times = []
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        tick_started = time.perf_counter()
+        await server.update_game_state()
+        tick_times.append(time.perf_counter() - tick_started)
+    elapsed = time.perf_counter() - started
+    server.cron_running = False
+
+    read_times = {"GET /game/state": [], "GET /agents": []}
+    if args.reads:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def read(path: str):
+                async with semaphore:
+                    read_started = time.perf_counter()
+                    await client.get(path.split(" ", 1)[1])
+                    read_times[path].append(time.perf_counter() - read_started)
+
+            await asyncio.gather(*(read(path) for _ in range(args.reads) for path in read_times))
+
+    mode = f"replay x{args.latency_scale}" if args.replay else "record" if args.record else "live"
+    print(f"⏱️  Tick benchmark ({mode}, {len(server.roster.agents)} agents)")
+    print("=" * 60)
+    report("tick", tick_times)
+    print(f"{'ticks per second':<28} {args.ticks / elapsed:8.2f}")
+    for name, samples in read_times.items():
+        if args.reads:
+            report(name, samples)
+
+    transport = server.get_mistral_client().http_client._transport
+    if hasattr(transport, "stats"):
+        print(f"{'replay':<28} {transport.stats()}")
+    await server.close_mistral_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick benchmark with recorded upstream traffic")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--record", metavar="FILE", help="Call the real API and record the traffic to FILE")
+    source.add_argument("--replay", metavar="FILE", help="Serve the traffic recorded in FILE, no network")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Replayed latency multiplier (1: original, 0: none)")
+    parser.add_argument("--ticks", type=int, default=10, help="Number of ticks")
+    parser.add_argument("--reads", type=int, default=0, help="Endpoint reads per endpoint after the ticks")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent endpoint reads")
+    args = parser.parse_args()
+
+    if args.record:
+        os.environ["UPSTREAM_RECORD"] = args.record
+    if args.replay:
+        os.environ["UPSTREAM_REPLAY"] = args.replay
+        os.environ["UPSTREAM_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+    os.environ.setdefault("GAME_HISTORY_DIR", "")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
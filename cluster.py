@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import hashlib
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of keys (agent ids) onto nodes (tick workers).
+
+    Each node owns vnodes points on the ring; when a node joins or leaves, only
+    the keys falling between its points and their predecessors change owner.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 100):
+        self.vnodes = vnodes
+        self.nodes: Tuple[str, ...] = tuple(sorted(set(nodes)))
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect_right(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class SQLiteCoordinator:
+    """
+    Shared coordination store for tick workers on one machine (or a shared disk).
+
+    workers: one row per live worker, kept fresh by heartbeats.
+    actions: the actions every worker generated, in publication order.
+
+    Calls block on SQLite; run them off the event loop (asyncio.to_thread).
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS actions ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, worker_id TEXT NOT NULL,"
+            " character TEXT NOT NULL, type TEXT, target TEXT, content TEXT)"
+        )
+
+    def heartbeat(self, worker_id: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?)"
+                " ON CONFLICT(worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (worker_id, time.time())
+            )
+
+    def live_workers(self, ttl: float) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT worker_id FROM workers WHERE heartbeat >= ? ORDER BY worker_id", (time.time() - ttl,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def leave(self, worker_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def publish(self, worker_id: str, actions: List[Tuple[str, Dict[str, Any]]]):
+        if not actions:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO actions (ts, worker_id, character, type, target, content) VALUES (?, ?, ?, ?, ?, ?)",
+                [(now, worker_id, char_id, action.get("type"), action.get("target"), action.get("content"))
+                 for char_id, action in actions]
+            )
+            self._db.execute("COMMIT")
+
+    def read_actions(self, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, ts, worker_id, character, type, target, content FROM actions"
+                " WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+            ).fetchall()
+        return [
+            {"id": row[0], "timestamp": row[1], "worker": row[2], "character": row[3],
+             "type": row[4], "target": row[5], "content": row[6]}
+            for row in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ClusterMembership:
+    """
+    This worker's view of the tick-worker cluster.
+
+    refresh() heartbeats, reads the live workers and rebuilds the hash ring
+    when they changed (a rebalance). Between refreshes, owns() says whether an
+    agent's character is driven by this worker. Views of different workers
+    converge within one refresh; until then a character may be skipped or
+    driven twice for a tick.
+    """
+
+    def __init__(self, coordinator: SQLiteCoordinator, worker_id: str, ttl: float = 30.0, vnodes: int = 100):
+        self.coordinator = coordinator
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.vnodes = vnodes
+        self.ring = HashRing([worker_id], vnodes)
+        self.rebalances = 0
+
+    def refresh(self) -> bool:
+        """Blocking; returns True when the partitioning changed"""
+        self.coordinator.heartbeat(self.worker_id)
+        workers = set(self.coordinator.live_workers(self.ttl)) | {self.worker_id}
+        if tuple(sorted(workers)) == self.ring.nodes:
+            return False
+        self.ring = HashRing(workers, self.vnodes)
+        self.rebalances += 1
+        return True
+
+    def owns(self, agent_id: str) -> bool:
+        return self.ring.owner(agent_id) == self.worker_id
+
+    def leave(self):
+        self.coordinator.leave(self.worker_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "workers": list(self.ring.nodes),
+            "rebalances": self.rebalances,
+        }
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional: without it every response stays JSON
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def _accept_quality(accept: str, media_types: Tuple[str, ...]) -> float:
+    """Highest q-value the Accept header grants to any of media_types (wildcards included)"""
+    best = 0.0
+    for part in accept.split(","):
+        fields = [field.strip() for field in part.split(";")]
+        media_type = fields[0].lower()
+        quality = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type in media_types or media_type == "*/*" or (
+            media_type.endswith("/*") and any(m.startswith(media_type[:-1]) for m in media_types)
+        ):
+            # An explicit media type is preferred over a wildcard of the same quality
+            if media_type in media_types:
+                quality += 0.0001
+            best = max(best, quality)
+    return best
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the response media type; JSON unless the client prefers MessagePack and it is available"""
+    if not accept or msgpack is None:
+        return JSON_MEDIA_TYPE
+    msgpack_quality = _accept_quality(accept, MSGPACK_MEDIA_TYPES)
+    json_quality = _accept_quality(accept, (JSON_MEDIA_TYPE,))
+    if msgpack_quality > 0 and msgpack_quality > json_quality:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(content, use_bin_type=True)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class EncodedBodyCache:
+    """
+    Encoded response bodies keyed by (resource, snapshot version, media type).
+
+    Bodies are only re-serialized when the underlying snapshot changes; old
+    versions fall out in LRU order.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    def get_or_encode(self, key: Hashable, media_type: str, build: Callable[[], Any]) -> bytes:
+        cache_key = (key, media_type)
+        body = self._entries.get(cache_key)
+        if body is not None:
+            self._entries.move_to_end(cache_key)
+            return body
+        body = encode(build(), media_type)
+        self._entries[cache_key] = body
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return body
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+OVERFLOW_POLICIES = ("reject", "drop_oldest", "coalesce")
+
+
+class ActionEvent:
+    """An action applied to a character of a world, as published on the bus"""
+
+    __slots__ = ("seq", "world", "character", "name", "action", "timestamp")
+
+    def __init__(self, seq: int, world: str, character: str, name: Optional[str], action: Dict[str, Any]):
+        self.seq = seq
+        self.world = world
+        self.character = character
+        self.name = name
+        self.action = action
+        self.timestamp = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "world": self.world,
+            "character": self.character,
+            "name": self.name,
+            "timestamp": self.timestamp,
+            **self.action,
+        }
+
+
+def by_character(event: ActionEvent) -> Hashable:
+    return (event.world, event.character)
+
+
+class Subscription:
+    """
+    One consumer's bounded view of the bus.
+
+    Up to maxsize events wait for the consumer; when it falls behind, policy
+    decides what happens to the next one:
+
+    - drop_oldest: the oldest waiting event is dropped to make room
+    - coalesce: an event replaces the waiting one with the same key (by default
+      the same character: only its latest action matters), the oldest is
+      dropped when there is none
+    - reject: waiting events are never dropped; while the queue is full, the
+      next ones are turned away (and counted as dropped)
+
+    Publishing never waits on a consumer. Dropped events are also counted per
+    world until the consumer takes them (take_gaps), so that it can tell where
+    its record has holes.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1000, policy: str = "drop_oldest",
+                 key: Optional[Callable[[ActionEvent], Hashable]] = None,
+                 accept: Optional[Callable[[ActionEvent], bool]] = None):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}' ({', '.join(OVERFLOW_POLICIES)})")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key or by_character
+        self.accept = accept
+        self.closed = False
+
+        self._events: Deque[ActionEvent] = deque()
+        self._coalesced: "OrderedDict[Hashable, ActionEvent]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_pending = 0
+        # world -> [events dropped, timestamp of the first one], until taken
+        self._gaps: Dict[str, List] = {}
+
+    def __len__(self) -> int:
+        return len(self._events) + len(self._coalesced)
+
+    @property
+    def full(self) -> bool:
+        return len(self) >= self.maxsize
+
+    def _drop(self, event: ActionEvent):
+        self.dropped += 1
+        gap = self._gaps.get(event.world)
+        if gap is None:
+            self._gaps[event.world] = [1, event.timestamp]
+        else:
+            gap[0] += 1
+
+    def offer(self, event: ActionEvent):
+        """Take an event without waiting, applying the overflow policy"""
+        if self.closed or (self.accept is not None and not self.accept(event)):
+            return
+        self.received += 1
+        if self.policy == "coalesce":
+            key = self.key(event)
+            if key in self._coalesced:
+                self._coalesced[key] = event
+                self.coalesced += 1
+            else:
+                if self.full:
+                    self._drop(self._coalesced.popitem(last=False)[1])
+                self._coalesced[key] = event
+        elif self.policy == "drop_oldest":
+            if self.full:
+                self._drop(self._events.popleft())
+            self._events.append(event)
+        elif self.full:
+            self._drop(event)
+            return
+        else:
+            self._events.append(event)
+        self.max_pending = max(self.max_pending, len(self))
+        self._ready.set()
+
+    def _take(self) -> ActionEvent:
+        if self._coalesced:
+            _, event = self._coalesced.popitem(last=False)
+        else:
+            event = self._events.popleft()
+        if not len(self):
+            self._ready.clear()
+        self.delivered += 1
+        return event
+
+    async def get(self) -> Optional[ActionEvent]:
+        """Next event, oldest first (None once closed and drained)"""
+        while not len(self):
+            if self.closed:
+                return None
+            await self._ready.wait()
+        return self._take()
+
+    async def get_many(self, limit: int = 500) -> List[ActionEvent]:
+        """Every waiting event (at least one, at most limit; [] once closed and drained)"""
+        event = await self.get()
+        if event is None:
+            return []
+        events = [event]
+        while len(self) and len(events) < limit:
+            events.append(self._take())
+        return events
+
+    def take_gaps(self, until: Optional[float] = None) -> Dict[str, Tuple[int, float]]:
+        """
+        Events dropped per world since the last call, as (count, timestamp of the
+        first one); with until, only the gaps that started no later than it
+        """
+        gaps = {}
+        for world, (count, timestamp) in list(self._gaps.items()):
+            if until is None or timestamp <= until:
+                gaps[world] = (count, timestamp)
+                del self._gaps[world]
+        return gaps
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ActionEvent:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def close(self):
+        """Stop taking events; the consumer still gets the waiting ones"""
+        self.closed = True
+        self._ready.set()
+
+    def stats(self) -> Dict[str, Any]:
+        if self._coalesced:
+            oldest = min(event.timestamp for event in self._coalesced.values())
+        else:
+            oldest = self._events[0].timestamp if self._events else None
+        return {
+            "policy": self.policy,
+            "maxsize": self.maxsize,
+            "pending": len(self),
+            "max_pending": self.max_pending,
+            # How long the oldest waiting event has been waiting
+            "lag_seconds": round(time.time() - oldest, 3) if oldest is not None else 0.0,
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+class EventBus:
+    """
+    In-process fan-out of the actions applied by the tick.
+
+    Producers publish (the tick, without ever waiting); every subscription
+    gets each event in its own bounded queue and is drained by its consumer
+    at its own pace (persistence, cluster sharing, streaming, metrics).
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.seq = 0
+        self.published = 0
+
+    def subscribe(self, name: str, maxsize: int = 1000, policy: str = "drop_oldest",
+                  key: Optional[Callable[[ActionEvent], Hashable]] = None,
+                  accept: Optional[Callable[[ActionEvent], bool]] = None) -> Subscription:
+        if name in self.subscriptions:
+            raise ValueError(f"Subscription '{name}' already exists")
+        subscription = Subscription(name, maxsize, policy, key, accept)
+        self.subscriptions[name] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        if self.subscriptions.get(subscription.name) is subscription:
+            del self.subscriptions[subscription.name]
+
+    def event(self, world: str, character: str, name: Optional[str], action: Dict[str, Any]) -> ActionEvent:
+        self.seq += 1
+        return ActionEvent(self.seq, world, character, name, action)
+
+    def publish(self, world: str, character: str, name: Optional[str], action: Dict[str, Any]) -> ActionEvent:
+        """Hand an action to every subscription; never waits"""
+        event = self.event(world, character, name, action)
+        self.published += 1
+        for subscription in list(self.subscriptions.values()):
+            subscription.offer(event)
+        return event
+
+    def close(self):
+        for subscription in self.subscriptions.values():
+            subscription.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "published": self.published,
+            "subscribers": {name: subscription.stats() for name, subscription in self.subscriptions.items()},
+        }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import importlib
+import random
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from world import DIRECTIONS
+
+ACTION_TYPES = ("move", "say", "emote")
+MOVE_DIRECTIONS = tuple(d for d in DIRECTIONS if d not in ("up", "down", "left", "right"))
+
+_START, _END = "<s>", "</s>"
+
+TEMPLATES = {
+    "move": ("{name} walks {target}.", "{name} heads {target}, looking around.", "{name} wanders {target}."),
+    "say": ("Hello {target}!", "How are you doing, {target}?", "Have you seen anything interesting, {target}?"),
+    "emote": ("{name} waves at {target}.", "{name} nods to {target}.", "{name} smiles at {target}."),
+}
+
+
+class TemplateGenerator:
+    """
+    Instant local actions from fixed templates.
+
+    Moves keep the character's last direction half of the time; say/emote
+    address one of the nearby characters (or the character itself when alone).
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.generated = 0
+
+    def observe(self, char_id: str, action: Dict[str, Any]):
+        """Learn from an action produced upstream (templates have nothing to learn)"""
+
+    def forget(self, char_id: str):
+        """Drop what was learned about a removed character"""
+
+    def choose_type(self, recent: Sequence[Dict[str, Any]], nearby: Sequence[str]) -> str:
+        if not nearby:
+            return "move"
+        return self.random.choice(ACTION_TYPES)
+
+    def choose_target(self, kind: str, recent: Sequence[Dict[str, Any]], nearby: Sequence[str]) -> str:
+        if kind == "move":
+            last_moves = [a.get("target") for a in recent if a.get("type") == "move" and a.get("target") in MOVE_DIRECTIONS]
+            if last_moves and self.random.random() < 0.5:
+                return last_moves[0]
+            return self.random.choice(MOVE_DIRECTIONS)
+        return self.random.choice(list(nearby)) if nearby else "self"
+
+    def content(self, kind: str, name: str, target: str) -> str:
+        return self.random.choice(TEMPLATES[kind]).format(name=name, target=target)
+
+    def generate(self, name: str, recent: Sequence[Dict[str, Any]], nearby: Sequence[str]) -> Dict[str, Any]:
+        """recent: the character's last actions, newest first; nearby: names it may address"""
+        kind = self.choose_type(recent, nearby)
+        target = self.choose_target(kind, recent, nearby)
+        self.generated += 1
+        return {"type": kind, "target": target, "content": self.content(kind, name, target)}
+
+
+class MarkovGenerator(TemplateGenerator):
+    """
+    Local actions modeled on what the upstream produced.
+
+    The action type follows the character's own type transitions (from its
+    recent actions), falling back to transitions seen across all characters.
+    Contents come from a word-bigram chain per action type, counted over the
+    last max_samples upstream contents (updated as samples come and go);
+    templates fill in until it has data.
+    """
+
+    def __init__(self, seed: Optional[int] = None, max_samples: int = 500, max_words: int = 25):
+        super().__init__(seed)
+        self.max_samples = max_samples
+        self.max_words = max_words
+        self._samples: Dict[str, Deque[List[str]]] = {kind: deque(maxlen=max_samples) for kind in ACTION_TYPES}
+        self._chains: Dict[str, Dict[str, Counter]] = {kind: {} for kind in ACTION_TYPES}
+        self._transitions: Dict[str, Counter] = {}
+        self._last_type: Dict[str, str] = {}
+
+    def observe(self, char_id: str, action: Dict[str, Any]):
+        kind = action.get("type")
+        if kind not in ACTION_TYPES:
+            return
+        previous = self._last_type.get(char_id)
+        if previous is not None:
+            self._transitions.setdefault(previous, Counter())[kind] += 1
+        self._last_type[char_id] = kind
+        words = (action.get("content") or "").split()
+        if words:
+            samples = self._samples[kind]
+            chain = self._chains[kind]
+            if len(samples) == samples.maxlen:
+                for current, following in self._bigrams(samples[0]):
+                    counts = chain[current]
+                    counts[following] -= 1
+                    if counts[following] <= 0:
+                        del counts[following]
+                        if not counts:
+                            del chain[current]
+            samples.append(words)
+            for current, following in self._bigrams(words):
+                chain.setdefault(current, Counter())[following] += 1
+
+    def forget(self, char_id: str):
+        self._last_type.pop(char_id, None)
+
+    @staticmethod
+    def _bigrams(words: List[str]):
+        return zip([_START] + words, words + [_END])
+
+    def _pick(self, counts: Counter) -> str:
+        choices, weights = zip(*counts.items())
+        return self.random.choices(choices, weights)[0]
+
+    def choose_type(self, recent: Sequence[Dict[str, Any]], nearby: Sequence[str]) -> str:
+        if not nearby:
+            return "move"
+        counts: Counter = Counter()
+        # recent is newest first: pairs (older, newer) are (recent[i+1], recent[i])
+        for newer, older in zip(recent, recent[1:]):
+            if older.get("type") == recent[0].get("type") and newer.get("type") in ACTION_TYPES:
+                counts[newer["type"]] += 1
+        if not counts and recent:
+            counts = self._transitions.get(recent[0].get("type"), Counter())
+        if not counts:
+            return super().choose_type(recent, nearby)
+        return self._pick(counts)
+
+    def content(self, kind: str, name: str, target: str) -> str:
+        chain = self._chains[kind]
+        if _START not in chain:
+            return super().content(kind, name, target)
+        words = []
+        current = _START
+        while len(words) < self.max_words:
+            current = self._pick(chain[current])
+            if current == _END:
+                break
+            words.append(current)
+        return " ".join(words) or super().content(kind, name, target)
+
+
+def load_generator(spec: str) -> Optional[TemplateGenerator]:
+    """markov, template, off, or module:attribute of a class with the same interface"""
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "markov":
+        return MarkovGenerator()
+    if spec == "template":
+        return TemplateGenerator()
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown fallback generator '{spec}' (markov, template, off or module:attribute)")
+    return getattr(importlib.import_module(module_name), attribute)()
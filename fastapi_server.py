@@ -4,18 +4,40 @@ import os
 import sys
 import asyncio
 import json
+import logging
+import socket
+import threading
 from typing import List, Optional, Any, Dict
-from fastapi import FastAPI, HTTPException, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, status, Request, Header, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import httpx
-from dotenv import load_dotenv
 from datetime import datetime
-import threading
 import time
+from functools import partial
 
-# Load environment variables
-load_dotenv()
+from upstream import UpstreamClient, RateBudget
+from admission import AdmissionController, AdmissionMiddleware
+from idempotency import IdempotencyStore, IdempotencyConflict
+from encoding import EncodedBodyCache, negotiate, MSGPACK_MEDIA_TYPE
+from game_store import GameStateStore
+from roster import RosterSync
+from memory import MemoryBank
+from routing import ModelRouter
+from scheduler import InterestScheduler
+from world import World
+from history import HistoryArchive
+from worlds import GameWorld
+from pregen import ActionQueues
+from events import EventBus, Subscription
+from cluster import ClusterMembership, SQLiteCoordinator
+from fallback import MarkovGenerator, TemplateGenerator, load_generator
+from structured_log import ErrorSampler, new_tick_id, setup_logging, shutdown_logging, tick_id
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from mistral_service import AsyncMistralAgentService, get_api_key, load_env
+from simple_mcp_server import SimpleMCPServer
 
 app = FastAPI(
     title="Mistral Agent Manager",
@@ -23,7 +45,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware
+# Admission control for the upstream-bound endpoints (/agents*, /mcp): per-route
+# concurrency limit, bounded wait, then 503 + Retry-After
+admission = AdmissionController()
+app.add_middleware(AdmissionMiddleware, controller=admission, router=app.router)
+
+# CORS middleware (outermost, so rejections carry CORS headers too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -32,21 +59,135 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mistral API configuration
-MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+# Mistral API configuration (the API key, .env and MISTRAL_BASE_URL, which can point to
+# a local stand-in when testing several processes, are resolved on first upstream call)
 MISTRAL_BASE_URL = "https://api.mistral.ai/v1"
 
-if not MISTRAL_API_KEY:
-    raise ValueError("MISTRAL_API_KEY environment variable is required")
+# Global state for game characters and their actions, keyed by full agent id
+# (indexed by action type and target for filtered reads; guarded by game_store.lock)
+game_store = GameStateStore(max_actions=10)
+
+# Per-character rolling memory (own actions + actions addressed to the character)
+memory_bank = MemoryBank()
+game_store.on_added.append(memory_bank.register)
+game_store.on_removed.append(memory_bank.forget)
+
+# Model choice per action call (agent's model, character priority, observed latency/errors)
+model_router = ModelRouter()
+
+# Which characters act on each tick: watched/addressed ones every tick, the rest decay
+scheduler = InterestScheduler()
+game_store.on_removed.append(scheduler.forget)
+
+# Character positions (grid-indexed), moved by move actions; say/emote targets are the neighbors
+world = World()
+game_store.on_added.append(world.spawn)
+game_store.on_removed.append(world.remove)
+
+# The default world is made of the globals above; named worlds (POST /worlds) get their own.
+# GAME_WORLD_NAME / GAME_WORLD_MEMBERS turn a process into the host of a single world
+# (see run_world.py)
+# Actions generated ahead of time, per character (GAME_PREGEN_BATCH > 1)
+action_queues = ActionQueues()
+game_store.on_removed.append(action_queues.forget)
+
+default_world = GameWorld("default", store=game_store, memory=memory_bank, scheduler=scheduler, world=world,
+                          queues=action_queues)
+worlds: Dict[str, GameWorld] = {default_world.name: default_world}
+
+def configure_world(game_world: GameWorld):
+    """Apply per-world tuning from the environment"""
+    game_world.store.max_characters = int(os.getenv("GAME_MAX_CHARACTERS", "10000"))
+    game_world.store.idle_ttl = float(os.getenv("GAME_CHARACTER_IDLE_TTL", "600"))
+    game_world.memory.token_budget = int(os.getenv("GAME_MEMORY_TOKENS", "300"))
+    game_world.scheduler.max_interval = int(os.getenv("GAME_MAX_INTERVAL_TICKS", "8"))
+    game_world.scheduler.interest_ttl = float(os.getenv("GAME_INTEREST_TTL", "30"))
+    game_world.scheduler.max_per_tick = int(os.getenv("GAME_MAX_UPDATES_PER_TICK", "0")) or None
+    game_world.scheduler.ambient_interval = int(os.getenv("GAME_AMBIENT_INTERVAL_TICKS", "0")) or None
+    game_world.world.view_radius = int(os.getenv("GAME_VIEW_RADIUS", "10"))
+    game_world.world.max_neighbors = int(os.getenv("GAME_MAX_NEIGHBORS", "8"))
+    game_world.world.spawn_size = int(os.getenv("GAME_WORLD_SIZE", "200"))
+    game_world.queues.batch_size = int(os.getenv("GAME_PREGEN_BATCH", "1"))
+    game_world.queues.low_water = int(os.getenv("GAME_PREGEN_LOW_WATER", "1"))
+    game_world.queues.max_age = float(os.getenv("GAME_PREGEN_MAX_AGE", "60"))
+
+# Distributed tick workers (GAME_CLUSTER_DB): the processes sharing the coordinator split
+# the characters between them by consistent hashing of the agent id (see tick_worker.py)
+cluster: Optional[ClusterMembership] = None
+
+def configure_cluster():
+    global cluster
+    
+    path = os.getenv("GAME_CLUSTER_DB")
+    if path and cluster is None:
+        worker_id = os.getenv("GAME_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+        cluster = ClusterMembership(
+            SQLiteCoordinator(path),
+            worker_id,
+            ttl=float(os.getenv("GAME_CLUSTER_TTL", "30"))
+        )
+
+# Local action generator used when the upstream fails, misses the tick deadline or the
+# request budget is spent, so the world keeps moving at full cadence
+fallback_generator: Optional[TemplateGenerator] = MarkovGenerator()
+fallback_counts = {"failed": 0, "deadline": 0, "budget": 0}
+
+# Action calls allowed per second across all worlds (GAME_UPSTREAM_RATE; unset: unlimited)
+upstream_budget = RateBudget()
 
-# Global state for game characters and their actions
-game_state = {
-    "characters": {},
-    "last_update": None
-}
+def forget_fallback(char_id: str):
+    if fallback_generator is not None:
+        fallback_generator.forget(char_id)
 
-# Lock for thread-safe access to game state
-state_lock = threading.Lock()
+game_store.on_removed.append(forget_fallback)
+
+def tick_deadline(game_world: GameWorld) -> float:
+    """Seconds a tick waits for the upstream before falling back (default: 80% of the interval)"""
+    deadline = float(os.getenv("GAME_TICK_DEADLINE", "0"))
+    return deadline if deadline > 0 else game_world.tick_interval * 0.8
+
+def configure_game():
+    """Apply game tuning from the environment (.env included)"""
+    global fallback_generator
+    
+    load_env()
+    configure_cluster()
+    fallback_generator = load_generator(os.getenv("GAME_FALLBACK", "markov"))
+    upstream_budget.rate = float(os.getenv("GAME_UPSTREAM_RATE", "0")) or None
+    configure_world(default_world)
+    name = os.getenv("GAME_WORLD_NAME", "default")
+    if name != default_world.name:
+        worlds.pop(default_world.name, None)
+        default_world.name = name
+        worlds[name] = default_world
+    members = [m.strip() for m in os.getenv("GAME_WORLD_MEMBERS", "").split(",") if m.strip()]
+    default_world.members = set(members) if members else None
+    default_world.tick_interval = float(os.getenv("GAME_TICK_INTERVAL", "5"))
+    default_world.max_concurrency = int(os.getenv("GAME_MAX_CONCURRENCY", "0")) or None
+    roster.refresh_interval = float(os.getenv("GAME_ROSTER_REFRESH", "30"))
+    model_router.default_model = os.getenv("GAME_DEFAULT_MODEL", "mistral-medium-2505")
+    model_router.fast_model = os.getenv("GAME_FAST_MODEL", "mistral-small-latest")
+    model_router.p95_target = float(os.getenv("GAME_MODEL_P95_TARGET", "4.0"))
+    model_router.max_error_rate = float(os.getenv("GAME_MODEL_MAX_ERROR_RATE", "0.2"))
+    admission.limit = int(os.getenv("ADMISSION_CONCURRENCY", "16"))
+    admission.queue_size = int(os.getenv("ADMISSION_QUEUE", "32"))
+    admission.max_wait = float(os.getenv("ADMISSION_MAX_WAIT", "2.0"))
+    idempotency_store.ttl = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+    model_router.set_key_agents(
+        agent_id.strip() for agent_id in os.getenv("GAME_KEY_AGENTS", "").split(",") if agent_id.strip()
+    )
+
+# Structured logs go through a queue to a writer thread (see structured_log.setup_logging);
+# repeated per-agent errors are sampled so an outage doesn't flood the log
+logger = logging.getLogger("game")
+error_sampler = ErrorSampler()
+
+def log_agent_error(message: str, agent_id: Optional[str], agent_name: Optional[str], **fields):
+    suppressed = error_sampler.allow((message, agent_id))
+    if suppressed is None:
+        return
+    logger.warning(message, extra={"agent_id": agent_id, "agent_name": agent_name,
+                                   "suppressed": suppressed, **fields})
 
 # Background task control
 cron_task = None
@@ -109,164 +250,611 @@ class GameAction(BaseModel):
 
 class Character(BaseModel):
     name: str
+    alias: Optional[str] = Field(None, description="Short unique alias (char-<end of agent id>)")
     actions: List[GameAction] = []
 
+class CharacterPriorityRequest(BaseModel):
+    priority: str = Field(..., description="key, normal or background")
+
+class WorldCreationRequest(BaseModel):
+    name: str = Field(..., description="World name (letters, digits, '-' and '_')")
+    members: Optional[List[str]] = Field(None, description="Member agent ids (null: every agent)")
+    tick_interval: float = Field(5.0, gt=0, description="Seconds between ticks")
+    max_concurrency: Optional[int] = Field(None, gt=0, description="Maximum concurrent action calls")
+
+class WorldUpdateRequest(BaseModel):
+    members: Optional[List[str]] = None
+    tick_interval: Optional[float] = Field(None, gt=0)
+    max_concurrency: Optional[int] = Field(None, gt=0)
+
 class GameStateResponse(BaseModel):
     characters: Dict[str, Character]
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page of characters")
 
-# HTTP client for Mistral API
-async def get_mistral_client():
-    return httpx.AsyncClient(
-        base_url=MISTRAL_BASE_URL,
-        headers={
-            "Authorization": f"Bearer {MISTRAL_API_KEY}",
-            "Content-Type": "application/json"
-        },
-        timeout=30.0
-    )
+def agent_list_from_upstream(data: Any) -> AgentListResponse:
+    # L'API Mistral retourne directement une liste d'agents
+    if isinstance(data, list):
+        return AgentListResponse(
+            data=[AgentResponse(**agent) for agent in data],
+            has_more=False,
+            first_id=data[0]["id"] if data else None,
+            last_id=data[-1]["id"] if data else None
+        )
+    return AgentListResponse(**data)
+
+# Content negotiation: JSON by default, MessagePack on request; bodies cached per snapshot
+MSGPACK_RESPONSES = {200: {"content": {MSGPACK_MEDIA_TYPE: {}}}}
+encoded_bodies = EncodedBodyCache()
+
+def negotiated_response(key: Any, accept: Optional[str], build) -> Response:
+    media_type = negotiate(accept)
+    body = encoded_bodies.get_or_encode(key, media_type, build)
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+# Shared HTTP client for Mistral API (connection pool, adaptive timeouts, hedging)
+mistral_client: Optional[UpstreamClient] = None
+
+def get_mistral_client() -> UpstreamClient:
+    global mistral_client
+    
+    if mistral_client is None:
+        load_env()
+        wrap_transport = upstream_transport_wrapper()
+        # A replay needs no key: nothing leaves the process
+        if os.getenv("UPSTREAM_REPLAY"):
+            api_key = os.getenv("MISTRAL_API_KEY") or "replay"
+        else:
+            api_key = get_api_key()
+        mistral_client = UpstreamClient(
+            base_url=os.getenv("MISTRAL_BASE_URL", MISTRAL_BASE_URL),
+            api_key=api_key,
+            default_timeout=float(os.getenv("UPSTREAM_TIMEOUT", "30")),
+            min_timeout=float(os.getenv("UPSTREAM_MIN_TIMEOUT", "2")),
+            max_timeout=float(os.getenv("UPSTREAM_MAX_TIMEOUT", "30")),
+            hedge_budget=float(os.getenv("UPSTREAM_HEDGE_BUDGET", "0.1")),
+            wrap_transport=wrap_transport
+        )
+    return mistral_client
+
+def upstream_transport_wrapper():
+    """
+    UPSTREAM_REPLAY=<file>: serve recorded traffic instead of calling the API
+    (UPSTREAM_REPLAY_LATENCY_SCALE: 1 original timing, 0 none);
+    UPSTREAM_RECORD=<file>: record the traffic of the shared client
+    """
+    replay_path = os.getenv("UPSTREAM_REPLAY")
+    if replay_path:
+        from replay import ReplayTransport
+        scale = float(os.getenv("UPSTREAM_REPLAY_LATENCY_SCALE", "1.0"))
+        return lambda inner: ReplayTransport(replay_path, latency_scale=scale)
+    record_path = os.getenv("UPSTREAM_RECORD")
+    if record_path:
+        from replay import RecordingTransport
+        return lambda inner: RecordingTransport(inner, record_path)
+    return None
+
+# Append-only archive of every action (GAME_HISTORY_DIR; empty disables it)
+history_archive: Optional[HistoryArchive] = None
+# Archives are opened from the archive consumer's thread as well as from requests
+archives_lock = threading.Lock()
+
+def get_history_archive() -> Optional[HistoryArchive]:
+    global history_archive
+    
+    with archives_lock:
+        if history_archive is None:
+            directory = os.getenv("GAME_HISTORY_DIR", "game_history")
+            if directory:
+                history_archive = HistoryArchive(directory)
+    return history_archive
+
+def close_history_archive():
+    global history_archive
+    
+    if history_archive is not None:
+        history_archive.close()
+        history_archive = None
+
+def world_archive(game_world: GameWorld) -> Optional[HistoryArchive]:
+    """Archive of a world: the main one for the default world, worlds/<name> inside it for the others"""
+    if game_world is default_world:
+        return get_history_archive()
+    with archives_lock:
+        if game_world.archive is None:
+            directory = os.getenv("GAME_HISTORY_DIR", "game_history")
+            if directory:
+                game_world.archive = HistoryArchive(os.path.join(directory, "worlds", game_world.name))
+    return game_world.archive
+
+# MCP tools served over HTTP, sharing the connection pool above and one agent cache
+mcp_server: Optional[SimpleMCPServer] = None
+
+def get_mcp_server() -> SimpleMCPServer:
+    global mcp_server
+    
+    if mcp_server is None:
+        http_client = get_mistral_client().http_client
+        mistral_service = AsyncMistralAgentService(
+            cache_ttl=float(os.getenv("MCP_CACHE_TTL", "30")),
+            http_client=http_client,
+            on_created=on_agent_created,
+            on_deleted=on_agent_deleted
+        )
+        mcp_server = SimpleMCPServer(
+            mistral_service=mistral_service,
+            max_concurrency=int(os.getenv("MCP_MAX_CONCURRENCY", "8"))
+        )
+    return mcp_server
+
+def on_agent_created(agent_data: Dict[str, Any]):
+    """Bring an agent created through the REST API or /mcp into the game"""
+    roster.add(agent_data)
+
+def on_agent_deleted(agent_id: str):
+    """Take a deleted agent out of the game"""
+    roster.remove(agent_id)
+    game_store.remove_character(agent_id)
+
+def invalidate_agent_cache(agent_id: Optional[str] = None):
+    """Drop cached agent listings/details after a create or delete through the REST API"""
+    if mcp_server is not None:
+        mcp_server.mistral_service.invalidate(agent_id)
+
+async def close_mistral_client():
+    global mistral_client, mcp_server
+    
+    mcp_server = None
+    if mistral_client is not None:
+        await mistral_client.aclose()
+        mistral_client = None
 
 # Function to get agent actions from Mistral
-async def get_agent_action(agent_id: str, agent_name: str) -> Optional[GameAction]:
-    """Get a single action from an agent"""
+def parse_actions(content: str, agent_name: str) -> List[GameAction]:
+    """Actions from a completion: a JSON array of actions or a single action object"""
+    # Extract JSON from the response (in case there's extra text): the first value
+    # that decodes, starting at a '[' or '{', wins; brackets inside strings are fine
+    decoder = json.JSONDecoder()
+    error = None
+    for start, char in enumerate(content):
+        if char not in "[{":
+            continue
+        try:
+            parsed, _ = decoder.raw_decode(content, start)
+        except json.JSONDecodeError as e:
+            error = error or e
+            continue
+        items = parsed if isinstance(parsed, list) else [parsed]
+        actions = [
+            GameAction(
+                type=item.get("type", "emote"),
+                target=item.get("target"),
+                content=item.get("content", f"{agent_name} did something")
+            )
+            for item in items if isinstance(item, dict)
+        ]
+        if actions:
+            return actions
+    if error is not None:
+        raise error
+    return []
+
+def render_triggers(triggers: List[Dict[str, Any]]) -> str:
+    """The actions a character is reacting to, for its prompt"""
+    lines = []
+    for event in triggers:
+        if event.get("type") == "say":
+            lines.append(f'- {event.get("from")} said to you: "{event.get("content")}"')
+        else:
+            lines.append(f'- {event.get("from")} did to you: {event.get("content")}')
+    return "\n".join(lines)
+
+async def get_agent_action(agent_id: str, agent_name: str, memory: str = "",
+                           model: Optional[str] = None,
+                           nearby: Optional[List[str]] = None,
+                           triggers: Optional[List[Dict[str, Any]]] = None) -> Optional[GameAction]:
+    """Get a single action from an agent (see get_agent_actions)"""
+    actions = await get_agent_actions(agent_id, agent_name, memory, model, nearby, triggers=triggers)
+    return actions[0] if actions else None
+
+async def get_agent_actions(agent_id: str, agent_name: str, memory: str = "",
+                            model: Optional[str] = None,
+                            nearby: Optional[List[str]] = None,
+                            count: int = 1,
+                            triggers: Optional[List[Dict[str, Any]]] = None) -> Optional[List[GameAction]]:
+    """
+    Get the next count actions of an agent in one completion (memory: the character's
+    budgeted recent history; model: chosen by model_router, the outcome is fed back to
+    it; nearby: names of the characters close enough to be addressed; triggers: the
+    actions addressed to the character it should react to first)
+    """
+    model = model or model_router.default_model
+    started = time.monotonic()
+    elapsed = None
+    ok = False
     try:
-        async with await get_mistral_client() as client:
-            # Create a completion request to get an action
-            completion_data = {
-                "model": "mistral-medium-2505",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": f"""You are {agent_name}, a character in a virtual world game. 
-                        Generate a single action in JSON format. The action must be one of these types:
-                        - "move": Move to a location (target: direction, content: description)
-                        - "say": Say something (target: who to speak to, content: what to say)
-                        - "emote": Perform an emotion/gesture (target: who to emote to, content: what emotion/gesture)
-                        
-                        Return ONLY a JSON object with this exact format:
-                        {{
-                            "type": "move|say|emote",
-                            "target": "optional_target",
-                            "content": "action_description"
-                        }}
-                        
-                        Be creative and make the action interesting for a game!"""
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Generate your next action as {agent_name} in the game world."
-                    }
-                ],
-                "max_tokens": 150,
-                "temperature": 0.8
-            }
-            
-            response = await client.post("/chat/completions", json=completion_data)
+        client = get_mistral_client()
+        # Create a completion request to get an action
+        completion_data = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": f"""You are {agent_name}, a character in a virtual world game. 
+                    Generate {"a single action" if count == 1 else f"your next {count} actions, in order,"} in JSON format. Each action must be one of these types:
+                    - "move": Move to a location (target: north, south, east, west, northeast, northwest, southeast or southwest, content: description)
+                    - "say": Say something (target: a nearby character to speak to, content: what to say)
+                    - "emote": Perform an emotion/gesture (target: a nearby character to emote to, content: what emotion/gesture)
+                    
+                    Return ONLY {"a JSON object" if count == 1 else f"a JSON array of {count} objects"} with this exact format:
+                    {"" if count == 1 else "["}{{
+                        "type": "move|say|emote",
+                        "target": "optional_target",
+                        "content": "action_description"
+                    }}{"" if count == 1 else ", ...]"}
+                    
+                    Be creative and make the action interesting for a game!"""
+                },
+                {
+                    "role": "user",
+                    "content": (f"What you remember:\n{memory}\n\n" if memory else "")
+                               + (f"Characters nearby: {', '.join(nearby)}\n\n" if nearby
+                                  else "Nobody is nearby; move to find someone to talk to.\n\n")
+                               + (f"Just now:\n{render_triggers(triggers)}\nReact to it first.\n\n" if triggers else "")
+                               + (f"Generate your next action as {agent_name} in the game world." if count == 1
+                                  else f"Generate your next {count} actions as {agent_name} in the game world.")
+                }
+            ],
+            "max_tokens": 150 * count,
+            "temperature": 0.8
+        }
+        
+        response = await client.post("/chat/completions", json=completion_data, hedge=True)
+        elapsed = time.monotonic() - started
+        
+        if response.status_code == 200:
+            data = response.json()
+            content = data["choices"][0]["message"]["content"].strip()
             
-            if response.status_code == 200:
-                data = response.json()
-                content = data["choices"][0]["message"]["content"].strip()
-                
-                # Try to parse JSON from the response
-                try:
-                    # Extract JSON from the response (in case there's extra text)
-                    start = content.find('{')
-                    end = content.rfind('}') + 1
-                    if start != -1 and end != 0:
-                        json_str = content[start:end]
-                        action_data = json.loads(json_str)
-                        
-                        return GameAction(
-                            type=action_data.get("type", "emote"),
-                            target=action_data.get("target"),
-                            content=action_data.get("content", f"{agent_name} did something")
-                        )
-                except (json.JSONDecodeError, KeyError) as e:
-                    print(f"Error parsing action for {agent_name}: {e}")
-                    # Fallback action
-                    return GameAction(
-                        type="emote",
-                        target="self",
-                        content=f"{agent_name} is thinking..."
-                    )
-            else:
-                print(f"Error getting action for {agent_name}: {response.status_code}")
+            # Try to parse JSON from the response
+            try:
+                actions = parse_actions(content, agent_name)[:count]
+                if actions:
+                    ok = True
+                    return actions
+            except (json.JSONDecodeError, KeyError, ValueError) as e:
+                log_agent_error("action parse failed", agent_id, agent_name, error=str(e))
+                # The tick falls back to the local generator
                 return None
-                
+        else:
+            log_agent_error("action request failed", agent_id, agent_name, status=response.status_code)
+            return None
+            
     except Exception as e:
-        print(f"Exception getting action for {agent_name}: {e}")
+        log_agent_error("action request raised", agent_id, agent_name, error=str(e))
         return None
+    finally:
+        model_router.record(model, elapsed, ok)
+
+async def generate_actions(semaphore: Optional[asyncio.Semaphore], agent_id: str, agent_name: str,
+                           memory: str, model: Optional[str], nearby: Optional[List[str]],
+                           count: int, triggers: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Refill of a character's action queue (see ActionQueues), within the world's concurrency budget"""
+    actions = await bounded(semaphore, get_agent_actions(agent_id, agent_name, memory, model, nearby,
+                                                         count, triggers))
+    return [action.dict() for action in actions or ()]
+
+# Agent roster for the game loop, maintained incrementally
+ROSTER_PAGE_SIZE = 100
+
+async def fetch_agent_roster() -> List[Dict[str, Any]]:
+    """Fetch the full agent catalog (every page) for a roster refresh"""
+    client = get_mistral_client()
+    agents = []
+    seen = set()
+    page = 0
+    while True:
+        response = await client.get("/agents", params={"page": page, "page_size": ROSTER_PAGE_SIZE}, hedge=True)
+        response.raise_for_status()
+        data = response.json()
+        batch = data if isinstance(data, list) else data.get("data", [])
+        # Stop on a short page, or if the API ignores paging and repeats itself
+        if not batch or batch[0].get("id") in seen:
+            break
+        seen.update(agent.get("id") for agent in batch)
+        agents.extend(batch)
+        has_more = len(batch) >= ROSTER_PAGE_SIZE if isinstance(data, list) else data.get("has_more", False)
+        if not has_more:
+            break
+        page += 1
+    return agents
+
+def on_roster_added(agent: Dict[str, Any]):
+    if default_world.includes(agent["id"]) and (cluster is None or cluster.owns(agent["id"])):
+        game_store.ensure_character(agent["id"], agent.get("name", f"Agent-{agent['id']}"))
+
+def on_roster_removed(agent_id: str):
+    for game_world in list(worlds.values()):
+        game_world.store.remove_character(agent_id)
+
+roster = RosterSync(fetch_agent_roster, on_added=on_roster_added, on_removed=on_roster_removed)
+
+async def bounded(semaphore: Optional[asyncio.Semaphore], coro):
+    """Await coro, holding the semaphore (a world's concurrency budget) if there is one"""
+    if semaphore is None:
+        return await coro
+    async with semaphore:
+        return await coro
 
 # Function to update game state with agent actions
 async def update_game_state():
-    """Update game state by fetching actions from all agents"""
-    global game_state, cron_running
+    """Update the default world's state by fetching actions from its agents"""
+    global cron_running
     
     if not cron_running:
         return
-        
+    await run_world_tick(default_world)
+
+async def run_world_tick(game_world: GameWorld):
+    """One tick of a world: fetch actions for its due characters and apply them"""
+    store = game_world.store
+    memory = game_world.memory
+    schedule = game_world.scheduler
+    space = game_world.world
+    queues = game_world.queues
+    
+    # Correlation id for everything logged during this tick (spawned tasks inherit it)
+    token = tick_id.set(new_tick_id())
+    started = time.monotonic()
     try:
-        # Get all agents
-        async with await get_mistral_client() as client:
-            response = await client.get("/agents")
+        # Get all agents: only the first tick waits for the roster, later refreshes
+        # run in the background and arrive here as a diff
+        await roster.ensure_loaded()
+        roster.collect()
+        if roster.last_error:
+            log_agent_error("roster refresh failed", None, None, error=roster.last_error)
+        agents = game_world.select_agents(roster.agents)
+        
+        # Fetch the next roster (when due) while this tick generates actions
+        roster.prefetch()
+        
+        # In cluster mode, keep only this worker's partition (rebalanced as workers come and go)
+        if cluster is not None:
+            if await asyncio.to_thread(cluster.refresh):
+                logger.info("cluster rebalanced", extra=cluster.stats())
+            agents = [agent for agent in agents if cluster.owns(agent.get("id"))]
+        
+        # Drop the characters idle for too long, or no longer members of the world / partition;
+        # idle ones whose agent is still here only go to make room for agents waiting for one
+        store.evict_idle(agent.get("id") for agent in agents)
+        if game_world.members is not None or cluster is not None:
+            store.sync_roster(agent.get("id") for agent in agents)
+        
+        # Create characters that don't exist yet (keyed by the full agent ID). At capacity,
+        # agents without a character wait for room (idle evictions) instead of evicting
+        # others on every tick, and don't act meanwhile
+        for agent in agents:
+            agent_id = agent.get("id")
+            store.ensure_character(agent_id, agent.get("name", f"Agent-{agent_id}"), evict=False)
+        with store.lock:
+            placed = [agent for agent in agents if agent.get("id") in store.characters]
+        unplaced = len(agents) - len(placed)
+        agents = placed
+        
+        # Only the characters due on this tick act (watched ones every tick)
+        due = set(schedule.select(agent.get("id") for agent in agents))
+        
+        # Process agents in parallel, within the world's concurrency budget
+        semaphore = game_world.semaphore
+        tasks = []
+        for agent in agents:
+            agent_id = agent.get("id")
+            if agent_id not in due:
+                continue
+            agent_name = agent.get("name", f"Agent-{agent_id}")
+            nearby = space.nearby_names(agent_id)
             
-            if response.status_code == 200:
-                data = response.json()
-                agents = data if isinstance(data, list) else data.get("data", [])
-                
-                # Process agents in parallel
-                tasks = []
-                for agent in agents:
-                    agent_id = agent.get("id")
-                    agent_name = agent.get("name", f"Agent-{agent_id}")
-                    
-                    # Create character if doesn't exist
-                    char_id = f"char-{agent_id[-8:]}"  # Use last 8 chars of agent ID
-                    
-                    with state_lock:
-                        if char_id not in game_state["characters"]:
-                            game_state["characters"][char_id] = {
-                                "name": agent_name,
-                                "actions": []
-                            }
-                    
-                    # Get action for this agent
-                    task = get_agent_action(agent_id, agent_name)
-                    tasks.append((char_id, task))
-                
-                # Wait for all actions to complete
-                for char_id, task in tasks:
-                    action = await task
-                    if action:
-                        with state_lock:
-                            if char_id in game_state["characters"]:
-                                # Add new action to the beginning of the list
-                                game_state["characters"][char_id]["actions"].insert(0, action.dict())
-                                
-                                # Keep only last 10 actions per character
-                                if len(game_state["characters"][char_id]["actions"]) > 10:
-                                    game_state["characters"][char_id]["actions"] = game_state["characters"][char_id]["actions"][:10]
-                
-                # Update last update time
-                with state_lock:
-                    game_state["last_update"] = datetime.now().isoformat()
-                    
-                print(f"Updated game state with {len(agents)} agents at {game_state['last_update']}")
-                
-    except Exception as e:
-        print(f"Error updating game state: {e}")
+            # With pre-generation, take the next queued action and top the queue up in
+            # the background once it runs low (the tick only waits when it's empty)
+            queued = queues.pop(agent_id) if queues.enabled else None
+            if queues.enabled and not queues.needs_refill(agent_id):
+                tasks.append((agent_id, agent_name, nearby, queued, queues.pending(agent_id)))
+                continue
+            
+            # Get action(s) for this agent, unless the request budget is spent
+            task = None
+            if upstream_budget.take():
+                context = memory.context(agent_id)
+                model = model_router.choose(agent)
+                triggers = schedule.take_triggers(agent_id)
+                if queues.enabled:
+                    task = queues.refill(agent_id, partial(
+                        generate_actions, semaphore, agent_id, agent_name, context, model, nearby,
+                        queues.batch_size, triggers
+                    ))
+                else:
+                    task = asyncio.ensure_future(bounded(semaphore, get_agent_action(
+                        agent_id, agent_name, context, model, nearby, triggers
+                    )))
+            tasks.append((agent_id, agent_name, nearby, queued, task))
+        
+        # Wait for the actions until the tick deadline (they run concurrently, so one
+        # slow completion doesn't delay the others); late ones are given up, except
+        # refills, which keep running for the next ticks
+        pending = [task for _, _, _, queued, task in tasks if queued is None and task is not None]
+        if pending:
+            _, late = await asyncio.wait(pending, timeout=tick_deadline(game_world))
+            if not queues.enabled:
+                for task in late:
+                    task.cancel()
+                await asyncio.gather(*late, return_exceptions=True)
+        
+        failed = 0
+        fallbacks = 0
+        for char_id, agent_name, nearby, queued, task in tasks:
+            action_data = queued
+            if action_data is None and task is not None and task.done() and not task.cancelled():
+                if queues.enabled:
+                    action_data = queues.pop(char_id)
+                elif task.result():
+                    action_data = task.result().dict()
+            if action_data is not None:
+                if fallback_generator is not None:
+                    fallback_generator.observe(char_id, action_data)
+            else:
+                reason = "budget" if task is None else "deadline" if task.cancelled() or not task.done() else "failed"
+                if reason == "failed":
+                    failed += 1
+                if fallback_generator is not None:
+                    with store.lock:
+                        recent = list(store.characters.get(char_id, {}).get("actions", ()))
+                    action_data = fallback_generator.generate(agent_name, recent, nearby)
+                    fallback_counts[reason] += 1
+                    fallbacks += 1
+            if action_data:
+                # Added at the head of the list; only the last 10 actions are kept
+                if store.add_action(char_id, action_data):
+                    memory.record(char_id, action_data)
+                    # History, cluster sharing and /game/events consume it off the tick
+                    event_bus.publish(game_world.name, char_id, agent_name, action_data)
+                    if action_data["type"] == "move":
+                        space.apply_move(char_id, action_data.get("target"), action_data.get("content"))
+                    # Whoever is addressed should answer soon, knowing what to answer to
+                    if action_data["type"] in ("say", "emote"):
+                        target_id = memory.resolve_target(action_data.get("target"))
+                        if target_id and target_id != char_id:
+                            schedule.trigger(target_id, dict(action_data, **{"from": agent_name}))
+                            # Its queued actions didn't see this coming
+                            queues.invalidate(target_id)
+        
+        # Update last update time
+        store.mark_updated()
+        game_world.ticks += 1
+            
+        logger.info("tick completed", extra={
+            "world": game_world.name,
+            "agents": len(agents),
+            "unplaced": unplaced,
+            "scheduled": len(tasks),
+            "failed": failed,
+            "fallbacks": fallbacks,
+            "duration": round(time.monotonic() - started, 3)
+        })
+            
+    except Exception:
+        logger.exception("tick failed", extra={"world": game_world.name})
+    finally:
+        tick_id.reset(token)
+
+# Applied actions are published on the bus; each consumer drains its own bounded queue
+# and does its I/O in a worker thread, so a slow disk or coordinator never delays the tick
+event_bus = EventBus()
+event_consumers: List[asyncio.Task] = []
+
+def report_drops(subscription: Subscription, reported: int) -> int:
+    """Log the actions a consumer lost since the last report; returns the new total"""
+    if subscription.dropped > reported:
+        logger.warning("event consumer fell behind, actions dropped",
+                       extra={"consumer": subscription.name, "dropped": subscription.dropped - reported})
+    return subscription.dropped
+
+def archive_events(events, gaps):
+    """Append events and a gap marker per world that lost actions, in time order"""
+    markers = [(timestamp, world, count) for world, (count, timestamp) in gaps.items()]
+    entries = sorted([(event.timestamp, event.world, event) for event in events] + markers,
+                     key=lambda entry: entry[0])
+    for timestamp, world_name, entry in entries:
+        game_world = worlds.get(world_name)
+        archive = world_archive(game_world) if game_world is not None else None
+        if archive is None:
+            continue
+        if isinstance(entry, int):
+            archive.mark_gap(entry, timestamp=timestamp)
+        else:
+            archive.append(entry.character, entry.action, timestamp=timestamp)
+
+async def archive_consumer(subscription: Subscription):
+    """Append the actions of every world to its history archive, in batches"""
+    dropped = 0
+    while True:
+        events = await subscription.get_many()
+        dropped = report_drops(subscription, dropped)
+        # Gaps that started after the batch are left for the next one
+        gaps = subscription.take_gaps(until=events[-1].timestamp if events else None)
+        if events or gaps:
+            try:
+                await asyncio.to_thread(archive_events, events, gaps)
+            except Exception:
+                logger.exception("history append failed", extra={"actions": len(events)})
+        if not events:
+            break
+
+async def cluster_consumer(subscription: Subscription):
+    """Share this worker's actions with the rest of the cluster, in batches"""
+    dropped = 0
+    while True:
+        events = await subscription.get_many()
+        if not events:
+            break
+        dropped = report_drops(subscription, dropped)
+        try:
+            await asyncio.to_thread(cluster.coordinator.publish, cluster.worker_id,
+                                    [(event.character, event.action) for event in events])
+        except Exception:
+            logger.exception("cluster publish failed", extra={"actions": len(events)})
+
+def start_event_consumers():
+    """Subscribe the built-in consumers (once; they outlive cron restarts)"""
+    if event_consumers:
+        return
+    # Both reject: what they hold is never dropped, and once full (a stalled disk or
+    # coordinator) further actions are turned away rather than piling up in memory.
+    # The archive gets a larger queue, and a gap row where actions were turned away
+    consumers = [("history", archive_consumer, "GAME_HISTORY_QUEUE_SIZE", "100000")]
+    if cluster is not None:
+        consumers.append(("cluster", cluster_consumer, "GAME_EVENT_QUEUE_SIZE", "10000"))
+    for name, consumer, size_variable, default_size in consumers:
+        subscription = event_bus.subscribe(name, maxsize=int(os.getenv(size_variable, default_size)),
+                                           policy="reject")
+        event_consumers.append(asyncio.create_task(consumer(subscription)))
+
+async def stop_event_consumers(timeout: float = 5.0):
+    """Let the consumers drain what was published, then stop them"""
+    event_bus.close()
+    if event_consumers:
+        _, late = await asyncio.wait(event_consumers, timeout=timeout)
+        for task in late:
+            task.cancel()
+        event_consumers.clear()
 
 # Background cron job
 async def cron_job():
-    """Background task that runs every 5 seconds"""
+    """Background task ticking the default world (every 5 seconds unless GAME_TICK_INTERVAL)"""
     global cron_running
     
     while cron_running:
         try:
             await update_game_state()
-            await asyncio.sleep(5)  # Wait 5 seconds
-        except Exception as e:
-            print(f"Error in cron job: {e}")
-            await asyncio.sleep(5)
+            await asyncio.sleep(default_world.tick_interval)
+        except Exception:
+            logger.exception("cron job iteration failed")
+            await asyncio.sleep(default_world.tick_interval)
+
+async def world_loop(game_world: GameWorld):
+    """Background task ticking a named world on its own interval"""
+    while game_world.running:
+        await run_world_tick(game_world)
+        await asyncio.sleep(game_world.tick_interval)
+
+def start_world(game_world: GameWorld):
+    if not game_world.running:
+        game_world.running = True
+        game_world.task = asyncio.create_task(world_loop(game_world))
+
+def stop_world(game_world: GameWorld):
+    game_world.running = False
+    if game_world.task:
+        game_world.task.cancel()
+        game_world.task = None
 
 # Start/Stop cron job functions
 def start_cron_job():
@@ -275,8 +863,13 @@ def start_cron_job():
     
     if not cron_running:
         cron_running = True
+        default_world.running = True
+        start_event_consumers()
         cron_task = asyncio.create_task(cron_job())
-        print("Cron job started")
+        for game_world in worlds.values():
+            if game_world is not default_world:
+                start_world(game_world)
+        logger.info("cron job started")
 
 def stop_cron_job():
     """Stop the background cron job"""
@@ -284,9 +877,17 @@ def stop_cron_job():
     
     if cron_running:
         cron_running = False
+        default_world.running = False
         if cron_task:
             cron_task.cancel()
-        print("Cron job stopped")
+        for game_world in worlds.values():
+            if game_world is not default_world:
+                stop_world(game_world)
+        roster.cancel()
+        # Hand this worker's partition over right away instead of after the heartbeat TTL
+        if cluster is not None:
+            cluster.leave()
+        logger.info("cron job stopped")
 
 @app.get("/")
 async def root():
@@ -301,13 +902,25 @@ async def root():
             "get_agent_by_name": "GET /agents/search/{agent_name}",
             "delete_agent": "DELETE /agents/{agent_id}",
             "game_state": "GET /game/state",
+            "world_state": "GET /game/{world_name}/state",
+            "worlds": "GET/POST /worlds, GET/PATCH/DELETE /worlds/{world_name}",
             "start_game": "POST /game/start",
-            "stop_game": "POST /game/stop"
+            "stop_game": "POST /game/stop",
+            "character_priority": "PUT /game/characters/{char_id}/priority",
+            "game_history": "GET /game/history",
+            "game_events": "GET /game/events",
+            "world_region": "GET /world/region",
+            "cluster": "GET /cluster/status, GET /cluster/actions",
+            "upstream_stats": "GET /upstream/stats",
+            "mcp": "POST /mcp"
         }
     }
 
+# Outcomes of POST /agents calls made with an Idempotency-Key header
+idempotency_store = IdempotencyStore()
+
 @app.post("/agents", response_model=AgentResponse, status_code=status.HTTP_201_CREATED)
-async def create_agent(agent_request: AgentCreationRequest):
+async def create_agent(agent_request: AgentCreationRequest, idempotency_key: Optional[str] = Header(default=None)):
     """
     Créer un nouvel agent Mistral
     
@@ -318,40 +931,66 @@ async def create_agent(agent_request: AgentCreationRequest):
     - **tools**: Liste des outils disponibles (optionnel)
     - **completion_args**: Arguments de complétion (optionnel)
     - **handoffs**: Liste des IDs d'agents pour les transferts (optionnel)
+    - **Idempotency-Key** (en-tête): rejouer une requête avec la même clé renvoie l'agent déjà
+      créé (en-tête `Idempotent-Replayed: true`) au lieu d'en créer un nouveau (optionnel)
     """
+    if not idempotency_key:
+        return await create_agent_upstream(agent_request)
+    
     try:
-        async with await get_mistral_client() as client:
-            # Prepare the request body according to Mistral API
-            request_body = {
-                "name": agent_request.name,
-                "model": agent_request.model
-            }
-            
-            if agent_request.description:
-                request_body["description"] = agent_request.description
-            if agent_request.instructions:
-                request_body["instructions"] = agent_request.instructions
-            if agent_request.tools:
-                request_body["tools"] = agent_request.tools
-            if agent_request.completion_args:
-                request_body["completion_args"] = agent_request.completion_args.dict(exclude_none=True)
-            if agent_request.handoffs:
-                request_body["handoffs"] = agent_request.handoffs
-            
-            response = await client.post("/agents", json=request_body)
-            
-            if response.status_code == 200:
-                agent_data = response.json()
-                return AgentResponse(**agent_data)
-            else:
-                try:
-                    error_detail = response.json()
-                except:
-                    error_detail = response.text
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erreur lors de la création de l'agent: {error_detail}"
-                )
+        agent, replayed = await idempotency_store.run(
+            idempotency_key,
+            agent_request.model_dump_json(),
+            lambda: create_agent_upstream(agent_request)
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if replayed:
+        return JSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=agent.model_dump(),
+            headers={"Idempotent-Replayed": "true"}
+        )
+    return agent
+
+async def create_agent_upstream(agent_request: AgentCreationRequest) -> AgentResponse:
+    """Create the agent through the Mistral API and add it to the roster"""
+    try:
+        client = get_mistral_client()
+        # Prepare the request body according to Mistral API
+        request_body = {
+            "name": agent_request.name,
+            "model": agent_request.model
+        }
+        
+        if agent_request.description:
+            request_body["description"] = agent_request.description
+        if agent_request.instructions:
+            request_body["instructions"] = agent_request.instructions
+        if agent_request.tools:
+            request_body["tools"] = agent_request.tools
+        if agent_request.completion_args:
+            request_body["completion_args"] = agent_request.completion_args.dict(exclude_none=True)
+        if agent_request.handoffs:
+            request_body["handoffs"] = agent_request.handoffs
+        
+        response = await client.post("/agents", json=request_body)
+        
+        if response.status_code == 200:
+            agent_data = response.json()
+            invalidate_agent_cache()
+            on_agent_created(agent_data)
+            return AgentResponse(**agent_data)
+        else:
+            try:
+                error_detail = response.json()
+            except:
+                error_detail = response.text
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Erreur lors de la création de l'agent: {error_detail}"
+            )
     
     except httpx.RequestError as e:
         raise HTTPException(
@@ -364,42 +1003,38 @@ async def create_agent(agent_request: AgentCreationRequest):
             detail=f"Erreur interne: {str(e)}"
         )
 
-@app.get("/agents", response_model=AgentListResponse)
-async def list_agents(page: Optional[int] = None):
+@app.get("/agents", response_model=AgentListResponse, responses=MSGPACK_RESPONSES)
+async def list_agents(page: Optional[int] = None, accept: Optional[str] = Header(default=None)):
     """
     Lister tous les agents Mistral
     
     - **page**: Numéro de page pour la pagination (optionnel)
+    - **Accept**: `application/msgpack` pour une réponse MessagePack (JSON par défaut)
     """
     try:
-        async with await get_mistral_client() as client:
-            params = {}
-            if page is not None:
-                params["page"] = page
-            
-            response = await client.get("/agents", params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                # L'API Mistral retourne directement une liste d'agents
-                if isinstance(data, list):
-                    return AgentListResponse(
-                        data=[AgentResponse(**agent) for agent in data],
-                        has_more=False,
-                        first_id=data[0]["id"] if data else None,
-                        last_id=data[-1]["id"] if data else None
-                    )
-                else:
-                    return AgentListResponse(**data)
-            else:
-                try:
-                    error_detail = response.json()
-                except:
-                    error_detail = response.text
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erreur lors de la récupération des agents: {error_detail}"
-                )
+        client = get_mistral_client()
+        params = {}
+        if page is not None:
+            params["page"] = page
+        
+        response = await client.get("/agents", params=params, hedge=True)
+        
+        if response.status_code == 200:
+            # The upstream body identifies the snapshot: unchanged catalogs reuse the encoded body
+            return negotiated_response(
+                ("agents", page, hash(response.content)),
+                accept,
+                lambda: agent_list_from_upstream(response.json()).model_dump()
+            )
+        else:
+            try:
+                error_detail = response.json()
+            except:
+                error_detail = response.text
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Erreur lors de la récupération des agents: {error_detail}"
+            )
     
     except httpx.RequestError as e:
         raise HTTPException(
@@ -420,26 +1055,26 @@ async def get_agent(agent_id: str):
     - **agent_id**: ID de l'agent à récupérer
     """
     try:
-        async with await get_mistral_client() as client:
-            response = await client.get(f"/agents/{agent_id}")
-            
-            if response.status_code == 200:
-                agent_data = response.json()
-                return AgentResponse(**agent_data)
-            elif response.status_code == 404:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Agent avec l'ID '{agent_id}' non trouvé"
-                )
-            else:
-                try:
-                    error_detail = response.json()
-                except:
-                    error_detail = response.text
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erreur lors de la récupération de l'agent: {error_detail}"
-                )
+        client = get_mistral_client()
+        response = await client.get(f"/agents/{agent_id}", route="/agents/{agent_id}", hedge=True)
+        
+        if response.status_code == 200:
+            agent_data = response.json()
+            return AgentResponse(**agent_data)
+        elif response.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Agent avec l'ID '{agent_id}' non trouvé"
+            )
+        else:
+            try:
+                error_detail = response.json()
+            except:
+                error_detail = response.text
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Erreur lors de la récupération de l'agent: {error_detail}"
+            )
     
     except httpx.RequestError as e:
         raise HTTPException(
@@ -460,25 +1095,27 @@ async def delete_agent(agent_id: str):
     - **agent_id**: ID de l'agent à supprimer
     """
     try:
-        async with await get_mistral_client() as client:
-            response = await client.delete(f"/agents/{agent_id}")
-            
-            if response.status_code in [200, 204]:
-                return {"message": f"Agent '{agent_id}' supprimé avec succès"}
-            elif response.status_code == 404:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Agent avec l'ID '{agent_id}' non trouvé"
-                )
-            else:
-                try:
-                    error_detail = response.json()
-                except:
-                    error_detail = response.text
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erreur lors de la suppression de l'agent: {error_detail}"
-                )
+        client = get_mistral_client()
+        response = await client.delete(f"/agents/{agent_id}", route="/agents/{agent_id}")
+        
+        if response.status_code in [200, 204]:
+            invalidate_agent_cache(agent_id)
+            on_agent_deleted(agent_id)
+            return {"message": f"Agent '{agent_id}' supprimé avec succès"}
+        elif response.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Agent avec l'ID '{agent_id}' non trouvé"
+            )
+        else:
+            try:
+                error_detail = response.json()
+            except:
+                error_detail = response.text
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Erreur lors de la suppression de l'agent: {error_detail}"
+            )
     
     except httpx.RequestError as e:
         raise HTTPException(
@@ -499,43 +1136,43 @@ async def get_agent_id_by_name(agent_name: str):
     - **agent_name**: Nom de l'agent à rechercher
     """
     try:
-        async with await get_mistral_client() as client:
-            response = await client.get("/agents")
-            
-            if response.status_code == 200:
-                data = response.json()
-                # L'API Mistral retourne directement une liste d'agents
-                if isinstance(data, list):
-                    agents = data
-                else:
-                    agents = data.get("data", [])
-                
-                # Rechercher l'agent par nom (insensible à la casse)
-                for agent in agents:
-                    if agent.get("name", "").lower() == agent_name.lower():
-                        return {
-                            "agent_name": agent["name"],
-                            "agent_id": agent["id"],
-                            "description": agent.get("description", ""),
-                            "model": agent.get("model", ""),
-                            "created_at": agent.get("created_at", "")
-                        }
-                
-                # Si aucun agent trouvé
-                return {
-                    "error": "Agent not found",
-                    "message": f"Aucun agent trouvé avec le nom '{agent_name}'",
-                    "agent_name": agent_name
-                }
+        client = get_mistral_client()
+        response = await client.get("/agents")
+        
+        if response.status_code == 200:
+            data = response.json()
+            # L'API Mistral retourne directement une liste d'agents
+            if isinstance(data, list):
+                agents = data
             else:
-                try:
-                    error_detail = response.json()
-                except:
-                    error_detail = response.text
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erreur lors de la recherche de l'agent: {error_detail}"
-                )
+                agents = data.get("data", [])
+            
+            # Rechercher l'agent par nom (insensible à la casse)
+            for agent in agents:
+                if agent.get("name", "").lower() == agent_name.lower():
+                    return {
+                        "agent_name": agent["name"],
+                        "agent_id": agent["id"],
+                        "description": agent.get("description", ""),
+                        "model": agent.get("model", ""),
+                        "created_at": agent.get("created_at", "")
+                    }
+            
+            # Si aucun agent trouvé
+            return {
+                "error": "Agent not found",
+                "message": f"Aucun agent trouvé avec le nom '{agent_name}'",
+                "agent_name": agent_name
+            }
+        else:
+            try:
+                error_detail = response.json()
+            except:
+                error_detail = response.text
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Erreur lors de la recherche de l'agent: {error_detail}"
+            )
     
     except httpx.RequestError as e:
         raise HTTPException(
@@ -554,11 +1191,121 @@ async def health_check():
     return {"status": "healthy", "message": "API Mistral Agent Manager + Game Engine opérationnelle"}
 
 # Game endpoints
-@app.get("/game/state", response_model=GameStateResponse)
-async def get_game_state():
-    """Get the current game state with all characters and their actions"""
-    with state_lock:
-        return GameStateResponse(characters=game_state["characters"])
+@app.get("/game/state", response_model=GameStateResponse, responses=MSGPACK_RESPONSES)
+async def get_game_state(
+    characters: Optional[str] = Query(None, description="Comma-separated character ids (agent ids or aliases)"),
+    action_type: Optional[str] = Query(None, description="Only actions of this type (move, say, emote)"),
+    target: Optional[str] = Query(None, description="Only actions with this target (case-insensitive)"),
+    actions_limit: Optional[int] = Query(None, gt=0, description="Maximum actions per character"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: Optional[int] = Query(None, gt=0, description="Maximum characters per page"),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Get the current game state with all characters and their actions
+    
+    Filters are served from per-type and per-target indexes, so a filtered read
+    only touches the matching characters. Characters with no matching action are
+    left out when filtering by type or target.
+    
+    Send `Accept: application/msgpack` for a MessagePack body; JSON is the default.
+    
+    Characters named in `characters` or `target` count as watched and are updated
+    on every tick for a while.
+    """
+    return world_state_response(default_world, characters, action_type, target,
+                                actions_limit, cursor, page_size, accept)
+
+@app.get("/game/{world_name}/state", response_model=GameStateResponse, responses=MSGPACK_RESPONSES)
+async def get_world_state(
+    world_name: str,
+    characters: Optional[str] = Query(None, description="Comma-separated character ids (agent ids or aliases)"),
+    action_type: Optional[str] = Query(None, description="Only actions of this type (move, say, emote)"),
+    target: Optional[str] = Query(None, description="Only actions with this target (case-insensitive)"),
+    actions_limit: Optional[int] = Query(None, gt=0, description="Maximum actions per character"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: Optional[int] = Query(None, gt=0, description="Maximum characters per page"),
+    accept: Optional[str] = Header(default=None)
+):
+    """State of a named world; same filters and encodings as /game/state"""
+    return world_state_response(get_world_or_404(world_name), characters, action_type, target,
+                                actions_limit, cursor, page_size, accept)
+
+def world_state_response(game_world: GameWorld, characters: Optional[str], action_type: Optional[str],
+                         target: Optional[str], actions_limit: Optional[int], cursor: Optional[str],
+                         page_size: Optional[int], accept: Optional[str]) -> Response:
+    store = game_world.store
+    character_ids = [c.strip() for c in characters.split(",") if c.strip()] if characters else None
+    watched = [store.resolve(c) for c in character_ids] if character_ids else []
+    watched.append(game_world.memory.resolve_target(target))
+    game_world.scheduler.view(char_id for char_id in watched if char_id)
+    params = (tuple(character_ids) if character_ids is not None else None,
+              action_type, target, actions_limit, cursor, page_size)
+    
+    with store.lock:
+        def build():
+            try:
+                selected, next_cursor = store.query(*params)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            return GameStateResponse(characters=selected, next_cursor=next_cursor).model_dump()
+        
+        return negotiated_response(("game_state", game_world.name, store.version, params), accept, build)
+
+def get_world_or_404(world_name: str) -> GameWorld:
+    game_world = worlds.get(world_name)
+    if game_world is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"World '{world_name}' not found")
+    return game_world
+
+@app.post("/worlds", status_code=status.HTTP_201_CREATED)
+async def create_world(request: WorldCreationRequest):
+    """Create a named world; it ticks on its own loop while the game is running"""
+    if request.name in worlds:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"World '{request.name}' already exists")
+    try:
+        game_world = GameWorld(request.name, members=request.members, tick_interval=request.tick_interval,
+                               max_concurrency=request.max_concurrency)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    configure_world(game_world)
+    game_world.store.on_removed.append(forget_fallback)
+    worlds[game_world.name] = game_world
+    if cron_running:
+        start_world(game_world)
+    return game_world.stats()
+
+@app.get("/worlds")
+async def list_worlds():
+    """All worlds, the default one included"""
+    return {"worlds": [game_world.stats() for game_world in worlds.values()]}
+
+@app.get("/worlds/{world_name}")
+async def get_world(world_name: str):
+    return get_world_or_404(world_name).stats()
+
+@app.patch("/worlds/{world_name}")
+async def update_world(world_name: str, request: WorldUpdateRequest):
+    """Change a world's members (null: every agent), tick interval or concurrency budget"""
+    game_world = get_world_or_404(world_name)
+    if "members" in request.model_fields_set:
+        game_world.members = set(request.members) if request.members is not None else None
+    if request.tick_interval is not None:
+        game_world.tick_interval = request.tick_interval
+    if "max_concurrency" in request.model_fields_set:
+        game_world.max_concurrency = request.max_concurrency
+    return game_world.stats()
+
+@app.delete("/worlds/{world_name}")
+async def delete_world(world_name: str):
+    """Stop a named world and drop its state (its history archive stays on disk)"""
+    game_world = get_world_or_404(world_name)
+    if game_world is default_world:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The default world cannot be deleted")
+    stop_world(game_world)
+    game_world.close()
+    del worlds[world_name]
+    return {"message": f"World '{world_name}' deleted"}
 
 @app.post("/game/start")
 async def start_game():
@@ -575,17 +1322,217 @@ async def stop_game():
 @app.get("/game/status")
 async def get_game_status():
     """Get the current game status"""
-    with state_lock:
+    archive = history_archive
+    history = archive.stats() if archive is not None else None
+    with game_store.lock:
         return {
             "running": cron_running,
-            "characters_count": len(game_state["characters"]),
-            "last_update": game_state["last_update"]
+            "characters_count": len(game_store.characters),
+            "evictions": dict(game_store.evictions),
+            "roster_size": len(roster.agents),
+            "roster_refreshes": roster.refreshes,
+            "worlds_count": len(worlds),
+            "scheduler": scheduler.stats(),
+            "models": model_router.stats(),
+            "errors_suppressed": error_sampler.suppressed_total,
+            "fallbacks": dict(fallback_counts),
+            "pregen": action_queues.stats(),
+            "events": event_bus.stats(),
+            "history": history,
+            "last_update": game_store.last_update
         }
 
+@app.get("/game/history")
+async def get_game_history(
+    character: Optional[str] = Query(None, description="Only this character (agent id or alias)"),
+    start: Optional[datetime] = Query(None, description="From this time (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Until this time (exclusive)"),
+    limit: Optional[int] = Query(None, gt=0, description="Maximum actions returned")
+):
+    """
+    Archived actions, oldest first, streamed as NDJSON (one action per line)
+    
+    Served from the on-disk archive, so it reaches back beyond the last 10
+    actions kept per character in /game/state. Where the archive fell behind and
+    actions were lost, a row of type "gap" (no character) holds how many.
+    """
+    archive = get_history_archive()
+    if archive is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="History archive is disabled")
+    char_id = (game_store.resolve(character) or character) if character else None
+    records = archive.query(
+        start=start.timestamp() if start else None,
+        end=end.timestamp() if end else None,
+        character=char_id,
+        limit=limit
+    )
+    
+    def chunk() -> Optional[str]:
+        lines = []
+        for record in records:
+            record["timestamp"] = datetime.fromtimestamp(record["timestamp"]).isoformat()
+            lines.append(json.dumps(record, ensure_ascii=False))
+            if len(lines) >= 500:
+                break
+        return "\n".join(lines) + "\n" if lines else None
+    
+    async def stream():
+        # Read in a worker thread, so a slow disk never stalls the tick or other requests
+        while True:
+            lines = await asyncio.to_thread(chunk)
+            if lines is None:
+                break
+            yield lines
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# Numbering of the /game/events subscriptions
+event_streams = 0
+
+@app.get("/game/events")
+async def stream_game_events(
+    world: Optional[str] = Query(None, description="Only this world"),
+    character: Optional[str] = Query(None, description="Only this character (agent id or alias)"),
+    policy: str = Query("drop_oldest", pattern="^(drop_oldest|coalesce)$",
+                        description="When the client falls behind: drop the oldest actions, or keep the latest per character"),
+    queue_size: int = Query(1000, gt=0, le=100000, description="Actions buffered for the client")
+):
+    """
+    Live actions as they are applied, streamed as NDJSON (one action per line)
+    
+    A client that reads slower than the game produces loses actions according to
+    policy (see the drop counters in /game/status under events) and never slows
+    the game down. A character followed by a stream counts as watched: it acts on
+    every tick while the stream is open.
+    """
+    global event_streams
+    
+    char_id = (game_store.resolve(character) or character) if character else None
+    event_streams += 1
+    subscription = event_bus.subscribe(
+        f"stream-{event_streams}", maxsize=queue_size, policy=policy,
+        accept=lambda event: (world is None or event.world == world)
+                             and (char_id is None or event.character == char_id)
+    )
+    
+    def watch():
+        for game_world in list(worlds.values()):
+            if (world is None or game_world.name == world) and char_id in game_world.store.characters:
+                game_world.scheduler.mark(char_id)
+    
+    async def stream():
+        try:
+            while True:
+                if char_id is not None:
+                    # Renewed well within the interest TTL, even when nothing happens
+                    watch()
+                    try:
+                        events = await asyncio.wait_for(subscription.get_many(),
+                                                        timeout=default_world.scheduler.interest_ttl / 2)
+                    except asyncio.TimeoutError:
+                        continue
+                else:
+                    events = await subscription.get_many()
+                if not events:
+                    break
+                yield "".join(json.dumps(
+                    {**event.to_dict(), "timestamp": datetime.fromtimestamp(event.timestamp).isoformat()},
+                    ensure_ascii=False
+                ) + "\n" for event in events)
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/cluster/status")
+async def get_cluster_status():
+    """Tick-worker cluster as seen by this process"""
+    if cluster is None:
+        return {"enabled": False}
+    with game_store.lock:
+        return {"enabled": True, **cluster.stats(), "owned_characters": len(game_store.characters)}
+
+@app.get("/cluster/actions")
+async def get_cluster_actions(
+    after: int = Query(0, ge=0, description="Last action id already read"),
+    limit: int = Query(1000, gt=0, le=10000, description="Maximum actions returned")
+):
+    """Actions published by every worker of the cluster, in publication order"""
+    if cluster is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cluster mode is disabled")
+    actions = await asyncio.to_thread(cluster.coordinator.read_actions, after, limit)
+    return {"actions": actions, "last_id": actions[-1]["id"] if actions else after}
+
+@app.get("/world/region")
+async def get_world_region(
+    x_min: int = Query(..., description="Left edge (inclusive)"),
+    y_min: int = Query(..., description="Bottom edge (inclusive)"),
+    x_max: int = Query(..., description="Right edge (inclusive)"),
+    y_max: int = Query(..., description="Top edge (inclusive)"),
+    limit: int = Query(1000, gt=0, le=10000, description="Maximum characters returned")
+):
+    """Characters whose position lies in the rectangle, served from the grid index"""
+    if x_min > x_max or y_min > y_max:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="x_min/y_min must not exceed x_max/y_max")
+    characters = world.region(x_min, y_min, x_max, y_max, limit + 1)
+    return {
+        "characters": characters[:limit],
+        "truncated": len(characters) > limit
+    }
+
+@app.put("/game/characters/{char_id}/priority")
+async def set_character_priority(char_id: str, request: CharacterPriorityRequest):
+    """Set a character's priority (key, normal, background) for model routing"""
+    agent_id = game_store.resolve(char_id) or char_id
+    try:
+        model_router.set_priority(agent_id, request.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"id": agent_id, "priority": request.priority}
+
+@app.get("/upstream/stats")
+async def get_upstream_stats():
+    """Observed upstream latency percentiles, adaptive timeouts, hedging, admission and idempotency counters"""
+    return {
+        **get_mistral_client().stats(),
+        "admission": admission.stats(),
+        "idempotency": idempotency_store.stats()
+    }
+
+@app.post("/mcp")
+async def mcp_endpoint(request: Request):
+    """
+    MCP streamable HTTP transport
+    
+    Accepts the same JSON-RPC requests (single or batch) and tools as src/simple_mcp_server.py.
+    """
+    try:
+        payload = await request.json()
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32700,
+                    "message": f"Parse error: {str(e)}"
+                }
+            }
+        )
+    
+    response = await get_mcp_server().handle_request(payload)
+    if response is None:
+        # Only notifications: accepted, nothing to return
+        return Response(status_code=status.HTTP_202_ACCEPTED)
+    return JSONResponse(content=response)
+
 # Startup event to start the cron job automatically
 @app.on_event("startup")
 async def startup_event():
     """Start the cron job when the server starts"""
+    configure_game()
+    setup_logging(os.getenv("LOG_LEVEL", "INFO"))
     start_cron_job()
 
 # Shutdown event to stop the cron job
@@ -593,6 +1540,16 @@ async def startup_event():
 async def shutdown_event():
     """Stop the cron job when the server shuts down"""
     stop_cron_job()
+    action_queues.close()
+    await stop_event_consumers()
+    await close_mistral_client()
+    for game_world in worlds.values():
+        if game_world is not default_world:
+            game_world.close()
+    close_history_archive()
+    if cluster is not None:
+        cluster.coordinator.close()
+    shutdown_logging()
 
 if __name__ == "__main__":
     import uvicorn
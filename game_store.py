@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+import base64
+import threading
+import time
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def encode_cursor(char_id: str) -> str:
+    return base64.urlsafe_b64encode(char_id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        return base64.b64decode(cursor + padding, altchars=b"-_", validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class GameStateStore:
+    """
+    Characters and their most recent actions.
+
+    Characters are keyed by their full agent id and carry a compact, unique alias.
+    Secondary indexes (action type -> characters, target -> characters) are kept
+    up to date as actions are inserted and trimmed, so filtered reads only touch
+    the matching characters. Characters are also kept in sorted id order for
+    cursor pagination.
+
+    Memory stays bounded: characters whose agent left the roster or that had no
+    action for idle_ttl seconds are removed, and beyond max_characters the least
+    recently active character is evicted (or the new one refused, for callers
+    that would otherwise evict on every tick).
+    """
+
+    def __init__(self, max_actions: int = 10, max_characters: Optional[int] = None,
+                 idle_ttl: Optional[float] = None):
+        self.max_actions = max_actions
+        self.max_characters = max_characters
+        self.idle_ttl = idle_ttl
+        self.lock = threading.RLock()
+        self.characters: Dict[str, Dict[str, Any]] = {}
+        self.last_update: Optional[str] = None
+        self.version = 0
+        self.evictions = {"roster": 0, "idle": 0, "capacity": 0}
+
+        self._by_type: Dict[str, Dict[str, int]] = {}
+        self._by_target: Dict[str, Dict[str, int]] = {}
+        self._order: List[str] = []
+        self._aliases: Dict[str, str] = {}
+        # char_id -> last activity (monotonic), least recently active first
+        self._recency: "OrderedDict[str, float]" = OrderedDict()
+
+        # Hooks for components keeping per-character state: (char_id, name) / (char_id)
+        self.on_added: List[Callable[[str, str], None]] = []
+        self.on_removed: List[Callable[[str], None]] = []
+
+    # Index maintenance
+
+    @staticmethod
+    def _index_add(index: Dict[str, Dict[str, int]], key: Optional[str], char_id: str):
+        if not key:
+            return
+        counts = index.setdefault(key, {})
+        counts[char_id] = counts.get(char_id, 0) + 1
+
+    @staticmethod
+    def _index_remove(index: Dict[str, Dict[str, int]], key: Optional[str], char_id: str):
+        if not key or key not in index:
+            return
+        counts = index[key]
+        remaining = counts.get(char_id, 0) - 1
+        if remaining > 0:
+            counts[char_id] = remaining
+        else:
+            counts.pop(char_id, None)
+            if not counts:
+                del index[key]
+
+    @staticmethod
+    def _target_key(action: Dict[str, Any]) -> Optional[str]:
+        target = action.get("target")
+        return target.lower() if isinstance(target, str) else None
+
+    def _index_action(self, char_id: str, action: Dict[str, Any]):
+        self._index_add(self._by_type, action.get("type"), char_id)
+        self._index_add(self._by_target, self._target_key(action), char_id)
+
+    def _unindex_action(self, char_id: str, action: Dict[str, Any]):
+        self._index_remove(self._by_type, action.get("type"), char_id)
+        self._index_remove(self._by_target, self._target_key(action), char_id)
+
+    def _make_alias(self, char_id: str) -> str:
+        """Short display alias (char-<last 8 chars>), lengthened until it is unique"""
+        for length in (8, 12, 16):
+            alias = f"char-{char_id[-length:]}"
+            if alias not in self._aliases:
+                return alias
+        return f"char-{char_id}"
+
+    def resolve(self, char_id_or_alias: str) -> Optional[str]:
+        if char_id_or_alias in self.characters:
+            return char_id_or_alias
+        return self._aliases.get(char_id_or_alias)
+
+    def _touch(self, char_id: str):
+        self._recency[char_id] = time.monotonic()
+        self._recency.move_to_end(char_id)
+
+    # Mutations
+
+    def ensure_character(self, char_id: str, name: str, evict: bool = True) -> bool:
+        """
+        Create the character if needed; returns True when it was created. At
+        max_characters, the least recently active one makes room unless evict is
+        False, in which case the character isn't created.
+        """
+        with self.lock:
+            if char_id in self.characters:
+                return False
+            if self.max_characters and not evict and len(self.characters) >= self.max_characters:
+                return False
+            if self.max_characters:
+                while len(self.characters) >= self.max_characters and self._recency:
+                    self.remove_character(next(iter(self._recency)))
+                    self.evictions["capacity"] += 1
+            alias = self._make_alias(char_id)
+            self.characters[char_id] = {"name": name, "alias": alias, "actions": []}
+            self._aliases[alias] = char_id
+            insort(self._order, char_id)
+            self._touch(char_id)
+            self.version += 1
+            for hook in self.on_added:
+                hook(char_id, name)
+            return True
+
+    def add_action(self, char_id: str, action: Dict[str, Any]) -> bool:
+        """Add an action at the head of the character's list, trimming to max_actions"""
+        with self.lock:
+            character = self.characters.get(char_id)
+            if character is None:
+                return False
+            actions = character["actions"]
+            actions.insert(0, action)
+            self._index_action(char_id, action)
+            while len(actions) > self.max_actions:
+                self._unindex_action(char_id, actions.pop())
+            self._touch(char_id)
+            self.version += 1
+            return True
+
+    def remove_character(self, char_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            character = self.characters.pop(char_id, None)
+            if character is None:
+                return None
+            for action in character["actions"]:
+                self._unindex_action(char_id, action)
+            self._aliases.pop(character["alias"], None)
+            self._recency.pop(char_id, None)
+            index = bisect_right(self._order, char_id) - 1
+            if index >= 0 and self._order[index] == char_id:
+                del self._order[index]
+            self.version += 1
+            for hook in self.on_removed:
+                hook(char_id)
+            return character
+
+    def sync_roster(self, agent_ids: Iterable[str]) -> List[str]:
+        """Remove characters whose agent is no longer in the roster; returns their ids"""
+        roster = set(agent_ids)
+        with self.lock:
+            departed = [char_id for char_id in self.characters if char_id not in roster]
+            for char_id in departed:
+                self.remove_character(char_id)
+            self.evictions["roster"] += len(departed)
+            return departed
+
+    def evict_idle(self, keep: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Remove characters without any action for idle_ttl seconds; returns their ids.
+        Idle characters in keep (agents still expected to act) stay and their idle
+        time restarts, except as many as it takes to make room for agents of keep
+        that have no character yet.
+        """
+        if not self.idle_ttl:
+            return []
+        deadline = time.monotonic() - self.idle_ttl
+        with self.lock:
+            idle = []
+            for char_id, last_active in self._recency.items():
+                if last_active > deadline:
+                    break
+                idle.append(char_id)
+            make_room = 0
+            if keep is not None:
+                keep = set(keep)
+                missing = sum(1 for char_id in keep if char_id not in self.characters)
+                free = self.max_characters - len(self.characters) if self.max_characters else missing
+                make_room = max(0, missing - free)
+            evicted = []
+            for char_id in idle:
+                if keep is None or char_id not in keep or make_room > 0:
+                    self.remove_character(char_id)
+                    evicted.append(char_id)
+                    make_room -= 1
+                else:
+                    self._touch(char_id)
+            self.evictions["idle"] += len(evicted)
+            return evicted
+
+    def mark_updated(self):
+        with self.lock:
+            self.last_update = datetime.now().isoformat()
+
+    # Reads
+
+    def _candidates(self, character_ids: Optional[Iterable[str]], action_type: Optional[str],
+                    target: Optional[str]) -> Optional[Set[str]]:
+        """Characters matching every filter, or None when nothing narrows the set"""
+        sets: List[Set[str]] = []
+        if action_type is not None:
+            sets.append(set(self._by_type.get(action_type, ())))
+        if target is not None:
+            sets.append(set(self._by_target.get(target.lower(), ())))
+        if character_ids is not None:
+            resolved = (self.resolve(char_id) for char_id in character_ids)
+            sets.append({char_id for char_id in resolved if char_id is not None})
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = sets[0]
+        for other in sets[1:]:
+            result = result & other
+        return result
+
+    def query(
+        self,
+        character_ids: Optional[Iterable[str]] = None,
+        action_type: Optional[str] = None,
+        target: Optional[str] = None,
+        actions_limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+        """
+        Filtered, paginated view of the characters.
+
+        Returns the matching characters (with only their matching actions) and
+        the cursor of the next page, if any.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        target_key = target.lower() if target is not None else None
+        filter_actions = action_type is not None or target_key is not None
+
+        with self.lock:
+            candidates = self._candidates(character_ids, action_type, target)
+            order = self._order if candidates is None else sorted(candidates)
+            start = bisect_right(order, after) if after is not None else 0
+
+            characters = {}
+            last_char_id = None
+            position = start
+            while position < len(order) and not (page_size and len(characters) >= page_size):
+                char_id = order[position]
+                position += 1
+                character = self.characters[char_id]
+                actions = character["actions"]
+                if filter_actions:
+                    actions = [
+                        action for action in actions
+                        if (action_type is None or action.get("type") == action_type)
+                        and (target_key is None or self._target_key(action) == target_key)
+                    ]
+                    # The indexes match type and target separately; a character can
+                    # still have no single action matching both
+                    if not actions:
+                        continue
+                if actions_limit is not None:
+                    actions = actions[:actions_limit]
+                characters[char_id] = {
+                    "name": character["name"],
+                    "alias": character["alias"],
+                    "actions": list(actions)
+                }
+                last_char_id = char_id
+
+            has_more = position < len(order)
+            next_cursor = encode_cursor(last_char_id) if has_more and last_char_id else None
+            return characters, next_cursor
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Column name -> struct code; every column but the timestamp holds string ids
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("ts", "d"),
+    ("character", "I"),
+    ("type", "I"),
+    ("target", "I"),
+    ("content", "I"),
+    # 1 + the previous row of the same character (0: its first row)
+    ("prev", "I"),
+)
+GROWTH_ROWS = 65536
+
+
+class Column:
+    """One fixed-width column in its own memory-mapped file, grown in chunks"""
+
+    def __init__(self, path: str, code: str):
+        self.path = path
+        self.format = "<" + code
+        self.width = struct.calcsize(self.format)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.capacity = os.fstat(self._fd).st_size // self.width
+        self._map: Optional[mmap.mmap] = None
+        if self.capacity:
+            self._map = mmap.mmap(self._fd, self.capacity * self.width)
+
+    def reserve(self, rows: int):
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity + GROWTH_ROWS)
+        if self._map is not None:
+            self._map.close()
+        os.ftruncate(self._fd, capacity * self.width)
+        self._map = mmap.mmap(self._fd, capacity * self.width)
+        self.capacity = capacity
+
+    def __getitem__(self, row: int):
+        return struct.unpack_from(self.format, self._map, row * self.width)[0]
+
+    def __setitem__(self, row: int, value):
+        struct.pack_into(self.format, self._map, row * self.width, value)
+
+    def flush(self):
+        if self._map is not None:
+            self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        os.close(self._fd)
+
+
+class StringTable:
+    """
+    Append-only string store: strings.bin holds length-prefixed UTF-8 entries,
+    strings.idx (a column) their offsets, with the string count in slot 0.
+
+    Id 0 stands for None. Only a bounded LRU of recently interned strings is
+    kept in memory; a string evicted from it and seen again is simply stored
+    once more.
+    """
+
+    def __init__(self, path: str, recent: int = 10000):
+        self.path = path
+        self.recent = recent
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._offsets = Column(os.path.splitext(path)[0] + ".idx", "Q")
+        self._interned: "OrderedDict[str, int]" = OrderedDict()
+        size = os.fstat(self._fd).st_size
+        self.count = self._offsets[0] if self._offsets.capacity else 0
+        if not self.count and size:
+            self._index_strings(size)
+        # Anything past the last committed entry is a torn write, overwritten next
+        self._size = self._end(self.count) if self.count else 0
+
+    def _end(self, string_id: int) -> int:
+        offset = self._offsets[string_id]
+        (length,) = struct.unpack("<I", os.pread(self._fd, 4, offset))
+        return offset + 4 + length
+
+    def _index_strings(self, size: int):
+        """Index a strings.bin written before strings.idx existed (once)"""
+        offset = 0
+        count = 0
+        with open(self.path, "rb") as f:
+            while offset + 4 <= size:
+                f.seek(offset)
+                (length,) = struct.unpack("<I", f.read(4))
+                if offset + 4 + length > size:
+                    break
+                count += 1
+                self._offsets.reserve(count + 1)
+                self._offsets[count] = offset
+                offset += 4 + length
+        self._offsets.reserve(1)
+        self._offsets[0] = count
+        self.count = count
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        string_id = self._interned.get(value)
+        if string_id is not None:
+            self._interned.move_to_end(value)
+            return string_id
+        data = value.encode("utf-8")
+        os.pwrite(self._fd, struct.pack("<I", len(data)) + data, self._size)
+        string_id = self.count + 1
+        self._offsets.reserve(string_id + 1)
+        self._offsets[string_id] = self._size
+        self._offsets[0] = string_id
+        self.count = string_id
+        self._size += 4 + len(data)
+        self._interned[value] = string_id
+        if len(self._interned) > self.recent:
+            self._interned.popitem(last=False)
+        return string_id
+
+    def get(self, string_id: int) -> Optional[str]:
+        if string_id == 0:
+            return None
+        offset = self._offsets[string_id]
+        (length,) = struct.unpack("<I", os.pread(self._fd, 4, offset))
+        return os.pread(self._fd, length, offset + 4).decode("utf-8")
+
+    def flush(self):
+        self._offsets.flush()
+
+    def close(self):
+        self._offsets.close()
+        os.close(self._fd)
+
+
+class HistoryArchive:
+    """
+    Append-only archive of every game action, stored column by column.
+
+    Each column is a memory-mapped file of fixed-width values (timestamp,
+    then string ids for character, type, target and content); the row count
+    lives in its own small file and is bumped after the row is written, so a
+    torn append is never visible. Timestamps never decrease, so time ranges
+    are found by binary search. Each row also links to the previous row of
+    the same character (prev column): per-character queries walk that chain
+    back from the character's newest row. Newest rows are found lazily, by a
+    backward scan resumed where the last one stopped, so memory grows with
+    the number of characters, not of rows.
+
+    Appends and reads may come from different threads: they hold lock, since
+    growing a column remaps it. Only one archive may have a directory open at a
+    time, across processes (an exclusive flock on its lock file).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = os.open(os.path.join(directory, "lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._lock_fd)
+            raise RuntimeError(f"History archive '{directory}' is already open (another server writing to it?)")
+        self.strings = StringTable(os.path.join(directory, "strings.bin"))
+        self.columns: Dict[str, Column] = {
+            name: Column(os.path.join(directory, f"{name}.col"), code) for name, code in COLUMNS
+        }
+        self._count_fd = os.open(os.path.join(directory, "rows"), os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._count_fd).st_size < 8:
+            os.ftruncate(self._count_fd, 8)
+        self._count_map = mmap.mmap(self._count_fd, 8)
+        # prev is left out: archives written before it existed get it filled below
+        self.count = min([struct.unpack_from("<Q", self._count_map)[0]]
+                         + [column.capacity for name, column in self.columns.items() if name != "prev"])
+        self._last_ts = self.columns["ts"][self.count - 1] if self.count else 0.0
+        # character -> its newest row; rows below _unscanned may hold newer rows of
+        # characters not in there yet
+        self._last_row: Dict[str, int] = {}
+        self._unscanned = self.count
+        if self.columns["prev"].capacity < self.count:
+            self._link_rows()
+
+    def _character_at(self, row: int, names: Dict[int, Optional[str]]) -> Optional[str]:
+        string_id = self.columns["character"][row]
+        if string_id not in names:
+            names[string_id] = self.strings.get(string_id)
+        return names[string_id]
+
+    def _link_rows(self):
+        """
+        Fill the prev column of an archive written before it existed (once); built
+        aside and moved in place, so an interrupted run is simply started over
+        """
+        path = self.columns["prev"].path
+        prev = Column(path + ".tmp", "I")
+        prev.reserve(self.count)
+        names: Dict[int, Optional[str]] = {}
+        for row in range(self.count):
+            name = self._character_at(row, names)
+            previous = self._last_row.get(name)
+            prev[row] = previous + 1 if previous is not None else 0
+            self._last_row[name] = row
+        prev.flush()
+        prev.close()
+        self.columns["prev"].close()
+        os.replace(path + ".tmp", path)
+        self.columns["prev"] = Column(path, "I")
+        self._unscanned = 0
+
+    def _newest_row(self, char_id: str) -> Optional[int]:
+        row = self._last_row.get(char_id)
+        if row is not None or not self._unscanned:
+            return row
+        names: Dict[int, Optional[str]] = {}
+        while self._unscanned:
+            self._unscanned -= 1
+            name = self._character_at(self._unscanned, names)
+            if name not in self._last_row:
+                self._last_row[name] = self._unscanned
+                if name == char_id:
+                    return self._unscanned
+        return None
+
+    def append(self, char_id: str, action: Dict[str, Any], timestamp: Optional[float] = None):
+        with self.lock:
+            ts = max(timestamp if timestamp is not None else time.time(), self._last_ts)
+            row = self.count
+            previous = self._newest_row(char_id)
+            values = {
+                "ts": ts,
+                "character": self.strings.intern(char_id),
+                "type": self.strings.intern(action.get("type")),
+                "target": self.strings.intern(action.get("target")),
+                "content": self.strings.intern(action.get("content")),
+                "prev": previous + 1 if previous is not None else 0,
+            }
+            for name, value in values.items():
+                column = self.columns[name]
+                column.reserve(row + 1)
+                column[row] = value
+            self.count = row + 1
+            struct.pack_into("<Q", self._count_map, 0, self.count)
+            self._last_ts = ts
+            self._last_row[char_id] = row
+
+    def mark_gap(self, count: int, timestamp: Optional[float] = None):
+        """Record that count actions from around timestamp never made it to the archive"""
+        self.append(None, {"type": "gap", "content": str(count)}, timestamp=timestamp)
+
+    def _ts_bound(self, rows, ts: float) -> int:
+        """First position among rows (row numbers in time order) whose timestamp is >= ts"""
+        timestamps = self.columns["ts"]
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = timestamps[rows[mid]]
+            if value < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def record(self, row: int) -> Dict[str, Any]:
+        columns = self.columns
+        get = self.strings.get
+        with self.lock:
+            return {
+                "timestamp": columns["ts"][row],
+                "character": get(columns["character"][row]),
+                "type": get(columns["type"][row]),
+                "target": get(columns["target"][row]),
+                "content": get(columns["content"][row]),
+            }
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              character: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Actions with start <= timestamp < end, optionally of one character, oldest
+        first; the lock is taken per record, never across a yield
+        """
+        with self.lock:
+            if character is not None:
+                rows = self._character_rows(character, start, end)
+            else:
+                rows = range(self.count)
+            lo = self._ts_bound(rows, start) if start is not None else 0
+            hi = self._ts_bound(rows, end) if end is not None else len(rows)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        for position in range(lo, hi):
+            yield self.record(rows[position])
+
+    def _character_rows(self, char_id: str, start: Optional[float], end: Optional[float]) -> array:
+        """The character's rows from the newest back to the first one before start, in time order"""
+        timestamps = self.columns["ts"]
+        prev = self.columns["prev"]
+        rows = array("I")
+        row = self._newest_row(char_id)
+        while row is not None:
+            if end is None or timestamps[row] < end:
+                rows.append(row)
+            if start is not None and timestamps[row] < start:
+                break
+            link = prev[row]
+            row = link - 1 if link else None
+        rows.reverse()
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "rows": self.count,
+                "characters_indexed": len(self._last_row),
+                "strings": self.strings.count,
+            }
+
+    def flush(self):
+        with self.lock:
+            for column in self.columns.values():
+                column.flush()
+            self.strings.flush()
+            self._count_map.flush()
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            for column in self.columns.values():
+                column.close()
+            self._count_map.close()
+            os.close(self._count_fd)
+            self.strings.close()
+            os.close(self._lock_fd)
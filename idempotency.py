@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class IdempotencyConflict(ValueError):
+    """The key was already used with a different request"""
+
+
+class IdempotencyStore:
+    """
+    Outcomes of requests carrying an Idempotency-Key, kept for ttl seconds.
+
+    The first request with a key runs; duplicates arriving while it is in
+    flight wait for the same result, and later ones get it replayed. The call
+    runs in its own task, so it completes (and is cached) even if the client
+    that started it disconnects. Failures are not cached: the next retry runs
+    again.
+    """
+
+    def __init__(self, ttl: float = 86400.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.replays = 0
+        # key -> (request fingerprint, task, expiry)
+        self._entries: "OrderedDict[str, Tuple[str, asyncio.Future, float]]" = OrderedDict()
+
+    def _purge(self, now: float):
+        while self._entries:
+            key, (_, _, expires) = next(iter(self._entries.items()))
+            if expires > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    async def run(self, key: str, fingerprint: str,
+                  call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of call() for this key, and whether it was shared with an earlier request"""
+        now = time.monotonic()
+        self._purge(now)
+        entry = self._entries.get(key)
+        if entry is not None:
+            known_fingerprint, task, _ = entry
+            if known_fingerprint != fingerprint:
+                raise IdempotencyConflict(f"Idempotency key '{key}' was already used with a different request")
+            self.replays += 1
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(call())
+        self._entries[key] = (fingerprint, task, now + self.ttl)
+
+        def forget_failure(done: asyncio.Future):
+            if done.cancelled() or done.exception() is not None:
+                if self._entries.get(key, (None, None))[1] is done:
+                    del self._entries[key]
+
+        task.add_done_callback(forget_failure)
+        self._purge(now)
+        return await asyncio.shield(task), False
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": len(self._entries), "replays": self.replays}
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting prompts"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _clip(text: Optional[str], limit: int = 80) -> str:
+    text = (text or "").strip().replace("\n", " ")
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class MemoryEvent:
+    __slots__ = ("own", "kind", "counterpart", "content")
+
+    def __init__(self, own: bool, kind: str, counterpart: Optional[str], content: Optional[str]):
+        self.own = own                  # True: this character acted; False: it was addressed
+        self.kind = kind                # move / say / emote
+        self.counterpart = counterpart  # target (own action) or actor (addressed)
+        self.content = content
+
+    def render(self) -> str:
+        content = _clip(self.content)
+        if self.own:
+            if self.kind == "move":
+                where = f" {self.counterpart}" if self.counterpart else ""
+                return f"- You moved{where}: {content}"
+            verb = "said" if self.kind == "say" else self.kind
+            to = f" to {self.counterpart}" if self.counterpart else ""
+            return f"- You {verb}{to}: {content}"
+        verb = "said to you" if self.kind == "say" else f"{self.kind} at you"
+        return f"- {self.counterpart} {verb}: {content}"
+
+
+class CharacterMemory:
+    """
+    Rolling memory of one character.
+
+    Recent events are kept verbatim; once there are more than max_recent, the
+    oldest half is folded into a compact summary (counts per kind of event and
+    counterpart, plus the last thing heard), so the memory never grows with the
+    length of the game.
+    """
+
+    def __init__(self, max_recent: int = 12, summary_counterparts: int = 5):
+        self.max_recent = max_recent
+        self.summary_counterparts = summary_counterparts
+        self.recent: Deque[MemoryEvent] = deque()
+        self.compacted_events = 0
+        self._counts: Counter = Counter()
+        self._last_heard: Optional[Tuple[str, str]] = None
+
+    def remember(self, event: MemoryEvent):
+        self.recent.append(event)
+        if len(self.recent) > self.max_recent:
+            self.compact(len(self.recent) // 2)
+
+    def compact(self, count: int):
+        for _ in range(min(count, len(self.recent))):
+            event = self.recent.popleft()
+            if event.own:
+                self._counts[(None, event.kind, event.counterpart)] += 1
+            else:
+                self._counts[(event.counterpart, event.kind, "you")] += 1
+                if event.kind == "say":
+                    self._last_heard = (event.counterpart, _clip(event.content, 60))
+            self.compacted_events += 1
+
+    def summary(self) -> str:
+        if not self.compacted_events:
+            return ""
+        parts = []
+        for (actor, kind, counterpart), count in self._counts.most_common(self.summary_counterparts):
+            who = f"{actor} " if actor else ""
+            towards = f" -> {counterpart}" if counterpart else ""
+            parts.append(f"{who}{kind}{towards} x{count}")
+        text = f"Earlier ({self.compacted_events} events): " + "; ".join(parts)
+        if self._last_heard:
+            text += f". Last heard from {self._last_heard[0]}: \"{self._last_heard[1]}\""
+        return text
+
+    def render(self, token_budget: int) -> str:
+        """Newest events first until the budget is spent; the summary is added if it still fits"""
+        lines: List[str] = []
+        used = 0
+        for event in reversed(self.recent):
+            line = event.render()
+            cost = estimate_tokens(line) + 1
+            if used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+        lines.reverse()
+
+        summary = self.summary()
+        if summary and used + estimate_tokens(summary) + 1 <= token_budget:
+            lines.insert(0, summary)
+        return "\n".join(lines)
+
+
+class MemoryBank:
+    """Per-character memories, fed from every action inserted into the game state"""
+
+    def __init__(self, token_budget: int = 300, max_recent: int = 12):
+        self.token_budget = token_budget
+        self.max_recent = max_recent
+        self.memories: Dict[str, CharacterMemory] = {}
+        self._names: Dict[str, str] = {}
+        self._ids_by_name: Dict[str, str] = {}
+
+    def register(self, char_id: str, name: str):
+        self._names[char_id] = name
+        self._ids_by_name[name.lower()] = char_id
+
+    def forget(self, char_id: str):
+        self.memories.pop(char_id, None)
+        name = self._names.pop(char_id, None)
+        if name and self._ids_by_name.get(name.lower()) == char_id:
+            del self._ids_by_name[name.lower()]
+
+    def resolve_target(self, target: Optional[str]) -> Optional[str]:
+        if not target:
+            return None
+        return self._ids_by_name.get(target.strip().lower())
+
+    def _memory(self, char_id: str) -> CharacterMemory:
+        memory = self.memories.get(char_id)
+        if memory is None:
+            memory = self.memories[char_id] = CharacterMemory(max_recent=self.max_recent)
+        return memory
+
+    def record(self, char_id: str, action: Dict[str, Any]):
+        """Remember an action for its actor and, for say/emote, for the character it addresses"""
+        kind = action.get("type") or "emote"
+        target = action.get("target")
+        content = action.get("content")
+        self._memory(char_id).remember(MemoryEvent(True, kind, target, content))
+
+        target_id = self.resolve_target(target) if kind in ("say", "emote") else None
+        if target_id and target_id != char_id:
+            actor = self._names.get(char_id, char_id)
+            self._memory(target_id).remember(MemoryEvent(False, kind, actor, content))
+
+    def context(self, char_id: str) -> str:
+        memory = self.memories.get(char_id)
+        return memory.render(self.token_budget) if memory else ""
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+
+class ActionQueues:
+    """
+    Per-character queues of actions generated ahead of time.
+
+    A refill asks the upstream for batch_size upcoming actions of one character
+    in a single completion and appends them to its queue. The tick pops one
+    action per character and starts a background refill once the queue is down
+    to low_water, so it rarely waits for the upstream. Queued actions older than
+    max_age are dropped, and so is a character's whole queue when something
+    happens to it (invalidate): they were written without knowing about it.
+
+    batch_size 1 disables pre-generation (the tick asks for each action itself).
+    """
+
+    def __init__(self, batch_size: int = 1, low_water: int = 1, max_age: float = 60.0):
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.max_age = max_age
+        self._queues: Dict[str, Deque[Tuple[float, Dict[str, Any]]]] = {}
+        self._refills: Dict[str, asyncio.Task] = {}
+        # Bumped by invalidate: a refill started before is discarded when it lands
+        self._generation: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.generated = 0
+        self.popped = 0
+        self.expired = 0
+        self.discarded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.batch_size > 1
+
+    def size(self, char_id: str) -> int:
+        return len(self._queues.get(char_id, ()))
+
+    def pop(self, char_id: str) -> Optional[Dict[str, Any]]:
+        """Next queued action of the character (None when its queue is empty)"""
+        queue = self._queues.get(char_id)
+        now = time.monotonic()
+        while queue:
+            generated_at, action = queue.popleft()
+            if now - generated_at <= self.max_age:
+                self.popped += 1
+                return action
+            self.expired += 1
+        return None
+
+    def needs_refill(self, char_id: str) -> bool:
+        return self.size(char_id) <= self.low_water and char_id not in self._refills
+
+    def pending(self, char_id: str) -> Optional[asyncio.Task]:
+        return self._refills.get(char_id)
+
+    def refill(self, char_id: str, produce: Callable[[], Awaitable[Optional[List[Dict[str, Any]]]]]) -> asyncio.Task:
+        """
+        Start filling the character's queue with the actions produce() returns
+        (None or [] on failure); a refill already in flight is returned instead
+        """
+        task = self._refills.get(char_id)
+        if task is None:
+            task = asyncio.ensure_future(self._refill(char_id, produce, self._generation.get(char_id, 0)))
+            self._refills[char_id] = task
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _refill(self, char_id: str, produce, generation: int) -> int:
+        try:
+            actions = await produce() or []
+        finally:
+            if self._refills.get(char_id) is asyncio.current_task():
+                del self._refills[char_id]
+        if self._generation.get(char_id, 0) != generation:
+            self.discarded += len(actions)
+            return 0
+        now = time.monotonic()
+        self._queues.setdefault(char_id, deque()).extend((now, action) for action in actions)
+        self.generated += len(actions)
+        return len(actions)
+
+    def invalidate(self, char_id: str):
+        """Drop the character's queued and in-flight actions"""
+        queue = self._queues.pop(char_id, None)
+        if queue:
+            self.discarded += len(queue)
+        self._generation[char_id] = self._generation.get(char_id, 0) + 1
+
+    def forget(self, char_id: str):
+        self._queues.pop(char_id, None)
+        self._generation.pop(char_id, None)
+        task = self._refills.pop(char_id, None)
+        if task is not None:
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "low_water": self.low_water,
+            "characters": len(self._queues),
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "refills_in_flight": len(self._refills),
+            "generated": self.generated,
+            "popped": self.popped,
+            "expired": self.expired,
+            "discarded": self.discarded,
+        }
+
+    def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        self._refills.clear()
+        self._queues.clear()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+# Only these response headers are kept; the rest (dates, request ids, cookies) would
+# only make recordings noisier
+RECORDED_HEADERS = ("content-type",)
+
+
+def _body_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=12).hexdigest()
+
+
+def _target(url: httpx.URL) -> str:
+    return url.raw_path.decode("ascii")
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Passes requests to the real transport and appends each exchange to a JSONL
+    file: method, path and query, request body hash, status, body and latency.
+    Request headers (the API key) are never written.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, path: str):
+        self.inner = inner
+        self.path = path
+        self.recorded = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._started = time.monotonic()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        content = await request.aread()
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        latency = time.monotonic() - started
+        await response.aclose()
+
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        self._file.write(json.dumps({
+            "offset": round(started - self._started, 6),
+            "latency": round(latency, 6),
+            "method": request.method,
+            "target": _target(request.url),
+            "request_hash": _body_hash(content),
+            "status": response.status_code,
+            "headers": headers,
+            "body": body.decode("utf-8", errors="replace"),
+        }, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.recorded += 1
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        self._file.close()
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded exchanges back without any network.
+
+    A request is answered with the next unused recording of the same method,
+    path and body; failing that, recordings of the same method and path are
+    served round-robin, since prompts drift as soon as the game diverges from
+    the recorded run. Each response is delayed by its recorded latency times
+    latency_scale (1: original timing, 0.1: ten times faster, 0: no delay),
+    bounded by the client's read timeout. Requests nobody recorded get a 502.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.served = 0
+        self.exact = 0
+        self.missing = 0
+        self._exact: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = {}
+        self._by_route: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._cursor: Dict[Tuple[str, str], int] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                route = (record["method"], record["target"])
+                self._exact.setdefault(route + (record["request_hash"],), deque()).append(record)
+                self._by_route.setdefault(route, []).append(record)
+
+    def _lookup(self, method: str, target: str, request_hash: str) -> Optional[Dict[str, Any]]:
+        exact = self._exact.get((method, target, request_hash))
+        if exact:
+            self.exact += 1
+            return exact.popleft()
+        recordings = self._by_route.get((method, target))
+        if not recordings:
+            return None
+        index = self._cursor.get((method, target), 0)
+        self._cursor[(method, target)] = index + 1
+        return recordings[index % len(recordings)]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        record = self._lookup(request.method, _target(request.url), _body_hash(content))
+        if record is None:
+            self.missing += 1
+            return httpx.Response(502, json={"error": "no recording for this request"}, request=request)
+        delay = record["latency"] * self.latency_scale
+        # The client's read timeout still applies, as it would on the network
+        timeout = (request.extensions.get("timeout") or {}).get("read")
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise httpx.ReadTimeout("Replayed response slower than the read timeout", request=request)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.served += 1
+        return httpx.Response(record["status"], headers=record["headers"],
+                              content=record["body"].encode("utf-8"), request=request)
+
+    def stats(self) -> Dict[str, int]:
+        return {"served": self.served, "exact": self.exact, "missing": self.missing}
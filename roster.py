@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+Agent = Dict[str, Any]
+
+
+class RosterSync:
+    """
+    Incrementally maintained agent roster for the game loop.
+
+    The full catalog is fetched on its own slower cadence, in the background, so a
+    tick never waits for it (except the very first one). Create/delete events
+    raised by this server's endpoints are applied immediately. Each refresh is
+    diffed against the known roster and only the changes reach the listeners.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[List[Agent]]],
+        refresh_interval: float = 30.0,
+        on_added: Optional[Callable[[Agent], None]] = None,
+        on_removed: Optional[Callable[[str], None]] = None,
+    ):
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.on_added = on_added
+        self.on_removed = on_removed
+
+        self.agents: Dict[str, Agent] = {}
+        self.loaded = False
+        self.last_refresh: Optional[float] = None
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Events seen while a refresh is in flight: its result predates them
+        self._pending_events: Dict[str, Optional[Agent]] = {}
+
+    # Events from this server's endpoints
+
+    def add(self, agent: Agent):
+        agent_id = agent.get("id")
+        if not agent_id:
+            return
+        if self._refresh_task is not None:
+            self._pending_events[agent_id] = agent
+        is_new = agent_id not in self.agents
+        self.agents[agent_id] = agent
+        if is_new and self.on_added:
+            self.on_added(agent)
+
+    def remove(self, agent_id: str):
+        if self._refresh_task is not None:
+            self._pending_events[agent_id] = None
+        if self.agents.pop(agent_id, None) is not None and self.on_removed:
+            self.on_removed(agent_id)
+
+    # Full refreshes
+
+    def apply(self, fetched: List[Agent]) -> Tuple[List[str], List[str]]:
+        """Diff a fetched catalog against the known roster; returns (added, removed) ids"""
+        latest = {agent["id"]: agent for agent in fetched if agent.get("id")}
+        for agent_id, agent in self._pending_events.items():
+            if agent is None:
+                latest.pop(agent_id, None)
+            else:
+                latest[agent_id] = agent
+        self._pending_events.clear()
+
+        removed = [agent_id for agent_id in self.agents if agent_id not in latest]
+        added = [agent_id for agent_id in latest if agent_id not in self.agents]
+        self.agents = latest
+        self.loaded = True
+        self.last_refresh = time.monotonic()
+        self.refreshes += 1
+
+        if self.on_removed:
+            for agent_id in removed:
+                self.on_removed(agent_id)
+        if self.on_added:
+            for agent_id in added:
+                self.on_added(latest[agent_id])
+        return added, removed
+
+    def due(self) -> bool:
+        return self.last_refresh is None or time.monotonic() - self.last_refresh >= self.refresh_interval
+
+    def prefetch(self):
+        """Start a background refresh if one is due, so it overlaps the current tick"""
+        if self._refresh_task is None and self.due():
+            self._refresh_task = asyncio.ensure_future(self.fetch())
+
+    def collect(self) -> Tuple[List[str], List[str]]:
+        """Apply a finished background refresh, if any; never waits"""
+        task = self._refresh_task
+        if task is None or not task.done():
+            return [], []
+        self._refresh_task = None
+        try:
+            fetched = task.result()
+        except Exception as e:
+            self.last_error = str(e)
+            self._pending_events.clear()
+            # Try again on the next cadence instead of on every tick
+            self.last_refresh = time.monotonic()
+            return [], []
+        self.last_error = None
+        return self.apply(fetched)
+
+    async def ensure_loaded(self):
+        """Block only until the first roster is known"""
+        if self.loaded:
+            return
+        self.prefetch()
+        if self._refresh_task is not None:
+            await asyncio.wait({self._refresh_task})
+        self.collect()
+
+    def cancel(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional
+
+from upstream import LatencyTracker
+
+PRIORITIES = ("key", "normal", "background")
+
+
+class ModelRouter:
+    """
+    Picks the model for each action-generation call.
+
+    - key characters keep their agent's model, unless it is failing
+    - normal characters use their agent's model while its p95 stays under
+      p95_target and its error rate under max_error_rate, else the fast model
+    - background characters always use the fast model
+
+    Latency and errors are observed per model from the calls themselves. A model
+    that is being avoided still gets one call in probe_every, so its figures can
+    recover once it is healthy again.
+    """
+
+    def __init__(
+        self,
+        default_model: str = "mistral-medium-2505",
+        fast_model: str = "mistral-small-latest",
+        p95_target: float = 4.0,
+        max_error_rate: float = 0.2,
+        window: int = 100,
+        probe_every: int = 20,
+    ):
+        self.default_model = default_model
+        self.fast_model = fast_model
+        self.p95_target = p95_target
+        self.max_error_rate = max_error_rate
+        self.window = window
+        self.probe_every = probe_every
+        self.latency = LatencyTracker(window=window, min_samples=10)
+        self.priorities: Dict[str, str] = {}
+        self.default_priority = "normal"
+        self._outcomes: Dict[str, Deque[bool]] = {}
+        self.routed: Dict[str, int] = {}
+        self._avoided: Dict[str, int] = {}
+
+    def set_priority(self, agent_id: str, priority: str):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}' (expected one of {', '.join(PRIORITIES)})")
+        self.priorities[agent_id] = priority
+
+    def set_key_agents(self, agent_ids: Iterable[str]):
+        for agent_id in agent_ids:
+            self.priorities[agent_id] = "key"
+
+    def priority_of(self, agent: Dict[str, Any]) -> str:
+        """Explicit priority first, then the agent's own metadata, then the default"""
+        agent_id = agent.get("id")
+        if agent_id in self.priorities:
+            return self.priorities[agent_id]
+        metadata = agent.get("metadata") or {}
+        priority = metadata.get("priority") if isinstance(metadata, dict) else None
+        return priority if priority in PRIORITIES else self.default_priority
+
+    def error_rate(self, model: str) -> float:
+        outcomes = self._outcomes.get(model)
+        if not outcomes or len(outcomes) < 10:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+
+    def is_slow(self, model: str) -> bool:
+        p95 = self.latency.percentile(model, 0.95)
+        return p95 is not None and p95 > self.p95_target
+
+    def is_failing(self, model: str) -> bool:
+        return self.error_rate(model) > self.max_error_rate
+
+    def choose(self, agent: Dict[str, Any]) -> str:
+        preferred = agent.get("model") or self.default_model
+        priority = self.priority_of(agent)
+
+        if priority == "background":
+            model = self.fast_model
+        elif priority == "key":
+            model = self.fast_model if self.is_failing(preferred) else preferred
+        elif self.is_slow(preferred) or self.is_failing(preferred):
+            model = self.fast_model
+        else:
+            model = preferred
+
+        if model != preferred and priority != "background":
+            avoided = self._avoided.get(preferred, 0) + 1
+            self._avoided[preferred] = avoided
+            if self.probe_every and avoided % self.probe_every == 0:
+                model = preferred
+
+        self.routed[model] = self.routed.get(model, 0) + 1
+        return model
+
+    def record(self, model: str, seconds: Optional[float], ok: bool):
+        """Feed back one call: its latency (when it completed) and whether it produced an action"""
+        if seconds is not None:
+            self.latency.record(model, seconds)
+        outcomes = self._outcomes.get(model)
+        if outcomes is None:
+            outcomes = self._outcomes[model] = deque(maxlen=self.window)
+        outcomes.append(ok)
+
+    def stats(self) -> Dict[str, Any]:
+        latency = self.latency.stats()
+        models = set(latency) | set(self._outcomes) | set(self.routed)
+        return {
+            model: {
+                "routed": self.routed.get(model, 0),
+                "p95": latency.get(model, {}).get("p95"),
+                "error_rate": self.error_rate(model),
+            }
+            for model in sorted(models)
+        }
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+"""
+Run a single game world in its own server process
+
+The process hosts one world, named and scoped by the arguments, with its own tick
+loop and history archive; its state is served at /game/<name>/state. Start one
+process per world to spread small scenarios across cores.
+
+Usage: python run_world.py NAME [--members ID,ID...] [--interval S] [--concurrency N] [--port P]
+"""
+
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a single game world in its own process")
+    parser.add_argument("name", help="World name (letters, digits, '-' and '_')")
+    parser.add_argument("--members", default="", help="Comma-separated member agent ids (default: every agent)")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between ticks")
+    parser.add_argument("--concurrency", type=int, default=0, help="Maximum concurrent action calls (0: unbounded)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    os.environ["GAME_WORLD_NAME"] = args.name
+    os.environ["GAME_WORLD_MEMBERS"] = args.members
+    os.environ["GAME_TICK_INTERVAL"] = str(args.interval)
+    os.environ["GAME_MAX_CONCURRENCY"] = str(args.concurrency)
+    # Not game_history/worlds/<name>: that is where a server keeps its own named worlds
+    os.environ.setdefault("GAME_HISTORY_DIR", os.path.join("game_history", "processes", args.name))
+
+    import uvicorn
+    from fastapi_server import app
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
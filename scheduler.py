@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+
+class InterestScheduler:
+    """
+    Decides which characters get a new action on each tick.
+
+    Characters someone is interested in (viewed through /game/state filters, or
+    recently addressed by another character's say/emote) are updated every
+    tick for interest_ttl seconds. Unobserved characters decay to a slower
+    cadence: their interval doubles after each update, up to max_interval
+    ticks. With max_per_tick set, addressed, interesting and most overdue
+    characters go first and the rest stay due for the next tick.
+
+    With ambient_interval set, scheduling is reactive: a character addressed
+    by another one (trigger) acts on the next tick, once, with the triggering
+    actions handed over to its prompt (take_triggers); everyone else not
+    watched acts every ambient_interval ticks.
+    """
+
+    def __init__(self, max_interval: int = 8, interest_ttl: float = 30.0,
+                 max_per_tick: Optional[int] = None, ambient_interval: Optional[int] = None,
+                 max_triggers: int = 5):
+        self.max_interval = max_interval
+        self.interest_ttl = interest_ttl
+        self.max_per_tick = max_per_tick
+        self.ambient_interval = ambient_interval
+        self.max_triggers = max_triggers
+        self.tick = 0
+        self.last_selected = 0
+        self.last_deferred = 0
+        self.last_reactions = 0
+
+        self._interval: Dict[str, int] = {}
+        self._next_due: Dict[str, int] = {}
+        # char_id -> monotonic deadline of the interest
+        self._interest: Dict[str, float] = {}
+        # char_id -> actions addressed to the character and not reacted to yet, oldest first
+        self._triggers: Dict[str, Deque[Dict[str, Any]]] = {}
+
+    # Interest signals
+
+    def mark(self, char_id: str):
+        """Bring a character to the every-tick cadence, starting with the next tick"""
+        self._interest[char_id] = time.monotonic() + self.interest_ttl
+        self._interval[char_id] = 1
+        self._next_due[char_id] = min(self._next_due.get(char_id, 0), self.tick + 1)
+
+    def trigger(self, char_id: str, event: Dict[str, Any]):
+        """
+        The character was addressed (event: the action, with the actor's name under
+        "from"); without ambient_interval, this only marks it interesting
+        """
+        if not self.ambient_interval:
+            self.mark(char_id)
+            return
+        self._triggers.setdefault(char_id, deque(maxlen=self.max_triggers)).append(event)
+        self._next_due[char_id] = min(self._next_due.get(char_id, 0), self.tick + 1)
+
+    def take_triggers(self, char_id: str) -> List[Dict[str, Any]]:
+        """The actions the character should react to (cleared once taken)"""
+        return list(self._triggers.pop(char_id, ()))
+
+    def view(self, char_ids: Iterable[str]):
+        for char_id in char_ids:
+            self.mark(char_id)
+
+    def is_interesting(self, char_id: str, now: Optional[float] = None) -> bool:
+        deadline = self._interest.get(char_id)
+        if deadline is None:
+            return False
+        if deadline <= (now if now is not None else time.monotonic()):
+            del self._interest[char_id]
+            return False
+        return True
+
+    def forget(self, char_id: str):
+        self._interval.pop(char_id, None)
+        self._next_due.pop(char_id, None)
+        self._interest.pop(char_id, None)
+        self._triggers.pop(char_id, None)
+
+    # Scheduling
+
+    def select(self, char_ids: Iterable[str]) -> List[str]:
+        """Advance one tick and return the characters to update on it"""
+        self.tick += 1
+        tick = self.tick
+        now = time.monotonic()
+        due = [char_id for char_id in char_ids if self._next_due.get(char_id, 0) <= tick]
+
+        deferred = 0
+        if self.max_per_tick and len(due) > self.max_per_tick:
+            due.sort(key=lambda char_id: (char_id not in self._triggers, not self.is_interesting(char_id, now),
+                                          self._next_due.get(char_id, 0)))
+            deferred = len(due) - self.max_per_tick
+            del due[self.max_per_tick:]
+
+        for char_id in due:
+            if self.is_interesting(char_id, now):
+                interval = 1
+            elif self.ambient_interval:
+                interval = self.ambient_interval
+            else:
+                previous = self._interval.get(char_id)
+                interval = 1 if previous is None else min(self.max_interval, previous * 2)
+            self._interval[char_id] = interval
+            self._next_due[char_id] = tick + interval
+
+        self.last_selected = len(due)
+        self.last_deferred = deferred
+        self.last_reactions = sum(1 for char_id in due if char_id in self._triggers)
+        return due
+
+    def stats(self) -> Dict[str, int]:
+        now = time.monotonic()
+        return {
+            "tick": self.tick,
+            "watched": sum(1 for char_id in list(self._interest) if self.is_interesting(char_id, now)),
+            "last_selected": self.last_selected,
+            "last_deferred": self.last_deferred,
+            "last_reactions": self.last_reactions,
+            "pending_reactions": len(self._triggers),
+        }
@@ -1,18 +1,171 @@
+import asyncio
 import os
-from typing import Dict, List, Any, Optional
-from mistralai import Mistral
-from dotenv import load_dotenv
+import time
+from typing import Dict, List, Any, Optional, Awaitable, Callable, Hashable, Tuple, TYPE_CHECKING
 
-# Load environment variables
-load_dotenv()
+if TYPE_CHECKING:
+    import httpx
 
-class MistralAgentService:
-    def __init__(self):
-        self.api_key = os.environ.get("MISTRAL_API_KEY")
-        if not self.api_key:
-            raise ValueError("MISTRAL_API_KEY environment variable is required")
+# The mistralai SDK, httpx and dotenv are imported on first use rather than at
+# import time: MCP processes are spawned per session and must answer tools/list fast
+_env_loaded = False
+
+def load_env():
+    """Load environment variables from .env once"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def get_api_key(api_key: Optional[str] = None) -> str:
+    """Resolve the Mistral API key (explicit value, then environment/.env), raising if missing"""
+    load_env()
+    api_key = api_key or os.environ.get("MISTRAL_API_KEY")
+    if not api_key:
+        raise ValueError("MISTRAL_API_KEY environment variable is required")
+    return api_key
+
+def _format_date(value: Any) -> str:
+    if not value:
+        return 'N/A'
+    if hasattr(value, 'strftime'):
+        return value.strftime('%m/%d/%Y, %I:%M:%S %p')
+    return str(value)
+
+def _temperature(agent: Any) -> Any:
+    completion_args = getattr(agent, 'completion_args', None)
+    if not completion_args:
+        return 'N/A'
+    if isinstance(completion_args, dict):
+        return completion_args.get('temperature', 'N/A')
+    value = getattr(completion_args, 'temperature', None)
+    return 'N/A' if value is None else value
+
+def _text_result(text: str, is_error: bool = False) -> Dict[str, Any]:
+    result = {
+        "content": [
+            {
+                "type": "text",
+                "text": text
+            }
+        ]
+    }
+    if is_error:
+        result["isError"] = True
+    return result
+
+def render_agent_list(agents_list: List[Any]) -> Dict[str, Any]:
+    if not agents_list:
+        return _text_result("No agents found. Create your first agent using the create_mistral_agent tool!")
+    
+    agent_list_text = "\n".join([
+        f"• {agent.name} (ID: {agent.id})\n"
+        f"  Description: {agent.description}\n"
+        f"  Model: {agent.model}\n"
+        f"  Created: {_format_date(getattr(agent, 'created_at', None))}\n"
+        for agent in agents_list
+    ])
+    return _text_result(f"🤖 Available Mistral Agents ({len(agents_list)}):\n\n{agent_list_text}")
+
+def render_agent_details(agent: Any) -> Dict[str, Any]:
+    return _text_result(
+        f"🤖 Agent Details: {agent.name}\n\n"
+        f"ID: {agent.id}\n"
+        f"Description: {agent.description}\n"
+        f"Instructions: {agent.instructions}\n"
+        f"Model: {agent.model}\n"
+        f"Temperature: {_temperature(agent)}\n"
+        f"Created: {_format_date(getattr(agent, 'created_at', None))}\n"
+        f"Updated: {_format_date(getattr(agent, 'updated_at', None))}"
+    )
+
+class TTLCache:
+    """
+    Small in-memory cache whose entries expire after ttl seconds.
+    
+    get_or_load coalesces concurrent misses for the same key into a single load.
+    """
+    
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._loading: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Drop the oldest insertion; entries are written in roughly expiry order
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+    
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+        # A load still in flight read the data before the change: it's no longer
+        # stored, and later callers start a fresh one
+        self._loading.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+        self._loading.clear()
+    
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        if self._loading.get(key) is asyncio.current_task():
+            self.set(key, value)
+        return value
+    
+    def _loaded(self, key: Hashable, task: asyncio.Task):
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        # Mark the exception as retrieved when nobody was waiting on it anymore
+        if not task.cancelled():
+            task.exception()
+    
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
         
-        self.client = Mistral(api_key=self.api_key)
+        # The load runs in its own task: a cancelled caller doesn't cancel it for
+        # the others waiting on the same key
+        task = self._loading.get(key)
+        if task is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._loading[key] = task
+            task.add_done_callback(lambda done: self._loaded(key, done))
+        return await asyncio.shield(task)
+
+class MistralAgentService:
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self._client = None
+    
+    @property
+    def client(self):
+        """SDK client, built on first use"""
+        if self._client is None:
+            from mistralai import Mistral
+            
+            self.api_key = get_api_key(self.api_key)
+            self._client = Mistral(api_key=self.api_key)
+        return self._client
     
     def create_agent(self, name: str, description: str, instructions: str, 
                     model: str = "mistral-medium-2505", temperature: float = 0.7) -> Dict[str, Any]:
@@ -73,32 +226,7 @@ class MistralAgentService:
             agents = self.client.beta.agents.list()
             agents_list = agents.data if hasattr(agents, 'data') else []
             
-            if not agents_list:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "No agents found. Create your first agent using the create_mistral_agent tool!"
-                        }
-                    ]
-                }
-            
-            agent_list_text = "\n".join([
-                f"• {agent.name} (ID: {agent.id})\n"
-                f"  Description: {agent.description}\n"
-                f"  Model: {agent.model}\n"
-                f"  Created: {agent.created_at.strftime('%m/%d/%Y, %I:%M:%S %p') if hasattr(agent, 'created_at') else 'N/A'}\n"
-                for agent in agents_list
-            ])
-            
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"🤖 Available Mistral Agents ({len(agents_list)}):\n\n{agent_list_text}"
-                    }
-                ]
-            }
+            return render_agent_list(agents_list)
         except Exception as e:
             return {
                 "content": [
@@ -115,21 +243,7 @@ class MistralAgentService:
         try:
             agent = self.client.beta.agents.retrieve(agent_id)
             
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"🤖 Agent Details: {agent.name}\n\n"
-                               f"ID: {agent.id}\n"
-                               f"Description: {agent.description}\n"
-                               f"Instructions: {agent.instructions}\n"
-                               f"Model: {agent.model}\n"
-                               f"Temperature: {getattr(agent, 'completion_args', {}).get('temperature', 'N/A')}\n"
-                               f"Created: {agent.created_at.strftime('%m/%d/%Y, %I:%M:%S %p') if hasattr(agent, 'created_at') else 'N/A'}\n"
-                               f"Updated: {agent.updated_at.strftime('%m/%d/%Y, %I:%M:%S %p') if hasattr(agent, 'updated_at') else 'N/A'}"
-                    }
-                ]
-            }
+            return render_agent_details(agent)
         except Exception as e:
             return {
                 "content": [
@@ -164,3 +278,124 @@ class MistralAgentService:
                 ],
                 "isError": True
             }
+
+
+class AsyncMistralAgentService:
+    """
+    Async variant of MistralAgentService for the MCP path.
+    
+    Uses the SDK's async methods over a pooled httpx client. list and retrieve
+    results are kept in a TTL cache that create/delete invalidate, and the
+    rendered agent listing is memoized against the catalog contents.
+    on_created (the agent as a dict) and on_deleted (its id) let the host
+    follow catalog changes made through this service.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, cache_ttl: float = 30.0,
+                 http_client: Optional["httpx.AsyncClient"] = None,
+                 on_created: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_deleted: Optional[Callable[[str], None]] = None):
+        self.api_key = api_key
+        self.on_created = on_created
+        self.on_deleted = on_deleted
+        self._owns_http_client = http_client is None
+        self.http_client = http_client
+        self._client = None
+        self.cache = TTLCache(ttl=cache_ttl)
+        self._rendered_listing: Optional[Tuple[Tuple, Dict[str, Any]]] = None
+    
+    @property
+    def client(self):
+        """SDK client over the pooled httpx client, built on first use"""
+        if self._client is None:
+            import httpx
+            from mistralai import Mistral
+            
+            self.api_key = get_api_key(self.api_key)
+            if self.http_client is None:
+                self.http_client = httpx.AsyncClient(
+                    timeout=30.0,
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+                )
+            self._client = Mistral(api_key=self.api_key, async_client=self.http_client)
+        return self._client
+    
+    def invalidate(self, agent_id: Optional[str] = None):
+        """Drop cached results after the catalog changed"""
+        self.cache.invalidate("agents")
+        if agent_id:
+            self.cache.invalidate(("agent", agent_id))
+    
+    async def _fetch_agents(self) -> List[Any]:
+        agents = await self.client.beta.agents.list_async()
+        return list(agents.data if hasattr(agents, 'data') else agents or [])
+    
+    async def create_agent(self, name: str, description: str, instructions: str,
+                           model: str = "mistral-medium-2505", temperature: float = 0.7) -> Dict[str, Any]:
+        """Create a new Mistral agent using the Python SDK"""
+        try:
+            agent = await self.client.beta.agents.create_async(
+                model=model,
+                description=description,
+                name=name,
+                instructions=instructions,
+                completion_args={
+                    "temperature": temperature
+                }
+            )
+            self.invalidate()
+            self.cache.set(("agent", agent.id), agent)
+            if self.on_created:
+                self.on_created(agent.model_dump(mode="json"))
+            
+            return _text_result(
+                f"✅ Successfully created Mistral agent \"{agent.name}\" with ID: {agent.id}\n\n"
+                f"Description: {agent.description}\n"
+                f"Model: {agent.model}\n"
+                f"Temperature: {_temperature(agent)}\n"
+                f"Created: {_format_date(getattr(agent, 'created_at', None))}"
+            )
+        except Exception as e:
+            return _text_result(f"Error: Failed to create agent: {str(e)}", is_error=True)
+    
+    async def list_agents(self) -> Dict[str, Any]:
+        """List all available Mistral agents"""
+        try:
+            agents_list = await self.cache.get_or_load("agents", self._fetch_agents)
+            
+            # Re-render only when the catalog actually changed since the last listing
+            fingerprint = tuple(
+                (agent.id, str(getattr(agent, 'updated_at', None))) for agent in agents_list
+            )
+            if self._rendered_listing is None or self._rendered_listing[0] != fingerprint:
+                self._rendered_listing = (fingerprint, render_agent_list(agents_list))
+            return self._rendered_listing[1]
+        except Exception as e:
+            return _text_result(f"Error: Failed to list agents: {str(e)}", is_error=True)
+    
+    async def get_agent_details(self, agent_id: str) -> Dict[str, Any]:
+        """Get details of a specific Mistral agent"""
+        try:
+            agent = await self.cache.get_or_load(
+                ("agent", agent_id),
+                lambda: self.client.beta.agents.get_async(agent_id=agent_id)
+            )
+            return render_agent_details(agent)
+        except Exception as e:
+            return _text_result(f"Error: Failed to get agent details: {str(e)}", is_error=True)
+    
+    async def delete_agent(self, agent_id: str) -> Dict[str, Any]:
+        """Delete a Mistral agent"""
+        try:
+            await self.client.beta.agents.delete_async(agent_id=agent_id)
+            self.invalidate(agent_id)
+            if self.on_deleted:
+                self.on_deleted(agent_id)
+            
+            return _text_result(f"✅ Successfully deleted agent with ID: {agent_id}")
+        except Exception as e:
+            return _text_result(f"Error: Failed to delete agent: {str(e)}", is_error=True)
+    
+    async def aclose(self):
+        if self._owns_http_client and self.http_client is not None:
+            await self.http_client.aclose()
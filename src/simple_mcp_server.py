@@ -1,15 +1,30 @@
 #!/usr/bin/env python3
 
+import asyncio
 import json
 import sys
 import os
-from typing import Dict, Any, List
-from mistral_service import MistralAgentService
+from typing import Dict, Any, List, Optional, Set, Union
+from mistral_service import AsyncMistralAgentService
+
+PROTOCOL_VERSION = "2025-03-26"
 
 class SimpleMCPServer:
-    def __init__(self):
-        self.mistral_service = MistralAgentService()
+    def __init__(self, mistral_service: Optional[AsyncMistralAgentService] = None, max_concurrency: int = 8):
+        self._mistral_service = mistral_service
         self.tools = self._define_tools()
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight: Dict[Any, asyncio.Task] = {}
+    
+    @property
+    def mistral_service(self) -> AsyncMistralAgentService:
+        """Created on the first tool call, so tools/list needs no SDK or network"""
+        if self._mistral_service is None:
+            self._mistral_service = AsyncMistralAgentService(
+                cache_ttl=float(os.getenv("MCP_CACHE_TTL", "30"))
+            )
+        return self._mistral_service
     
     def _define_tools(self) -> List[Dict[str, Any]]:
         """Define available MCP tools"""
@@ -84,14 +99,76 @@ class SimpleMCPServer:
             }
         ]
     
-    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle incoming JSON-RPC requests"""
+    async def handle_request(self, request: Union[Dict[str, Any], List[Any]]) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Handle incoming JSON-RPC requests (a single request object or a batch array)"""
+        if isinstance(request, list):
+            if not request:
+                return self._invalid_request()
+            # Calls inside a batch run concurrently; gather keeps the original order
+            responses = await asyncio.gather(*(self._handle_single(item) for item in request))
+            return self._collect_batch(list(responses))
+        return await self._handle_single(request)
+    
+    def _invalid_request(self) -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {
+                "code": -32600,
+                "message": "Invalid Request"
+            }
+        }
+    
+    def _collect_batch(self, responses: List[Optional[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Batch responses keep request order; notifications are left out, and an all-notification batch gets no reply"""
+        responses = [response for response in responses if response is not None]
+        return responses or None
+    
+    async def _handle_single(self, request: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(request, dict):
+            return self._invalid_request()
+        
+        if request.get("method") == "tools/call":
+            # Bound the number of upstream calls in flight across requests and batches
+            async with self._semaphore:
+                response = await self._execute(request)
+        else:
+            response = await self._execute(request)
+        # Notifications (no "id" member) never get a reply
+        if "id" not in request:
+            return None
+        return response
+    
+    async def _execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
         try:
             method = request.get("method")
             request_id = request.get("id")
             params = request.get("params", {})
             
-            if method == "tools/list":
+            if method == "initialize":
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {
+                        "protocolVersion": PROTOCOL_VERSION,
+                        "capabilities": {
+                            "tools": {}
+                        },
+                        "serverInfo": {
+                            "name": "lechat-mistral-agent-mcp",
+                            "version": "1.0.0"
+                        }
+                    }
+                }
+            
+            elif method == "ping":
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {}
+                }
+            
+            elif method == "tools/list":
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
@@ -105,7 +182,7 @@ class SimpleMCPServer:
                 arguments = params.get("arguments", {})
                 
                 if tool_name == "create_mistral_agent":
-                    result = self.mistral_service.create_agent(
+                    result = await self.mistral_service.create_agent(
                         name=arguments["name"],
                         description=arguments["description"],
                         instructions=arguments["instructions"],
@@ -119,7 +196,7 @@ class SimpleMCPServer:
                     }
                 
                 elif tool_name == "list_mistral_agents":
-                    result = self.mistral_service.list_agents()
+                    result = await self.mistral_service.list_agents()
                     return {
                         "jsonrpc": "2.0",
                         "id": request_id,
@@ -127,7 +204,7 @@ class SimpleMCPServer:
                     }
                 
                 elif tool_name == "get_agent_details":
-                    result = self.mistral_service.get_agent_details(arguments["agent_id"])
+                    result = await self.mistral_service.get_agent_details(arguments["agent_id"])
                     return {
                         "jsonrpc": "2.0",
                         "id": request_id,
@@ -135,7 +212,7 @@ class SimpleMCPServer:
                     }
                 
                 elif tool_name == "delete_mistral_agent":
-                    result = self.mistral_service.delete_agent(arguments["agent_id"])
+                    result = await self.mistral_service.delete_agent(arguments["agent_id"])
                     return {
                         "jsonrpc": "2.0",
                         "id": request_id,
@@ -172,38 +249,106 @@ class SimpleMCPServer:
                 }
             }
     
-    def run(self):
-        """Run the MCP server on stdio"""
-        print("LeChat Mistral Agent MCP Server (Python) running on stdio", file=sys.stderr)
+    def _cancel(self, params: Dict[str, Any]):
+        """Handle notifications/cancelled: drop the in-flight request, no response is sent"""
+        task = self._in_flight.get(params.get("requestId"))
+        if task:
+            task.cancel()
+    
+    async def _dispatch(self, request: Any, out: asyncio.Queue):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            response = await self.handle_request(request)
+            if response is not None:
+                out.put_nowait(response)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._in_flight.get(request_id) is asyncio.current_task():
+                del self._in_flight[request_id]
+    
+    async def _write_responses(self, out: asyncio.Queue, stream):
+        """Write responses as they complete, flushing once per burst"""
+        while True:
+            response = await out.get()
+            if response is None:
+                break
+            stream.write(json.dumps(response).encode() + b"\n")
+            while not out.empty():
+                response = out.get_nowait()
+                if response is None:
+                    stream.flush()
+                    return
+                stream.write(json.dumps(response).encode() + b"\n")
+            stream.flush()
+    
+    async def _open_stdin(self) -> asyncio.StreamReader:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=2 ** 24)
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+        except (ValueError, OSError):
+            # stdin is a regular file or a console: feed the reader from a thread instead
+            def pump():
+                for line in sys.stdin.buffer:
+                    loop.call_soon_threadsafe(reader.feed_data, line)
+                loop.call_soon_threadsafe(reader.feed_eof)
+            loop.run_in_executor(None, pump)
+        return reader
+    
+    async def serve(self):
+        """Read JSON-RPC lines from stdin and process them concurrently, correlated by id"""
+        reader = await self._open_stdin()
+        out: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(self._write_responses(out, sys.stdout.buffer))
+        tasks: Set[asyncio.Task] = set()
         
         while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            
             try:
-                line = input()
-                if not line:
-                    continue
-                
                 request = json.loads(line)
-                response = self.handle_request(request)
-                print(json.dumps(response))
-                sys.stdout.flush()
-            
-            except EOFError:
-                break
             except Exception as e:
-                error_response = {
+                out.put_nowait({
                     "jsonrpc": "2.0",
                     "id": None,
                     "error": {
                         "code": -32700,
                         "message": f"Parse error: {str(e)}"
                     }
-                }
-                print(json.dumps(error_response))
-                sys.stdout.flush()
+                })
+                continue
+            
+            if isinstance(request, dict) and request.get("method") == "notifications/cancelled":
+                self._cancel(request.get("params") or {})
+                continue
+            
+            task = asyncio.create_task(self._dispatch(request, out))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            if isinstance(request, dict) and request.get("id") is not None:
+                self._in_flight[request["id"]] = task
+        
+        # EOF: let in-flight calls finish before closing stdout
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        out.put_nowait(None)
+        await writer
+        if self._mistral_service is not None:
+            await self._mistral_service.aclose()
+    
+    def run(self):
+        """Run the MCP server on stdio"""
+        print("LeChat Mistral Agent MCP Server (Python) running on stdio", file=sys.stderr)
+        asyncio.run(self.serve())
 
 def main():
     """Main entry point"""
-    server = SimpleMCPServer()
+    server = SimpleMCPServer(max_concurrency=int(os.getenv("MCP_MAX_CONCURRENCY", "8")))
     server.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+import uuid
+from typing import Dict, Hashable, Optional, Tuple
+
+# Correlation id of the tick being processed; inherited by the tasks it spawns
+tick_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("tick_id", default=None)
+
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def new_tick_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, tick id and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TickContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "tick_id"):
+            current = tick_id.get()
+            if current is not None:
+                record.tick_id = current
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread; drops them instead of blocking when it falls behind"""
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the writer thread; only resolve the message here
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class ErrorSampler:
+    """
+    Rate limit for repeated errors, per key (e.g. event and agent id).
+
+    Within each window, the first burst occurrences of a key are logged, then
+    one in sample_every; across all keys at most max_per_window are logged.
+    Each logged occurrence reports how many were suppressed before it.
+    """
+
+    def __init__(self, window: float = 60.0, burst: int = 3, sample_every: int = 100,
+                 max_per_window: int = 200):
+        self.window = window
+        self.burst = burst
+        self.sample_every = sample_every
+        self.max_per_window = max_per_window
+        self.suppressed_total = 0
+        self._window_start = time.monotonic()
+        self._logged_in_window = 0
+        # key -> (occurrences in window, suppressed since last logged)
+        self._counts: Dict[Hashable, Tuple[int, int]] = {}
+
+    def allow(self, key: Hashable) -> Optional[int]:
+        """None to suppress this occurrence, else the number suppressed since the last one logged"""
+        now = time.monotonic()
+        if now - self._window_start >= self.window:
+            self._window_start = now
+            self._logged_in_window = 0
+            self._counts.clear()
+
+        seen, suppressed = self._counts.get(key, (0, 0))
+        seen += 1
+        logged = (seen <= self.burst or seen % self.sample_every == 0) \
+            and self._logged_in_window < self.max_per_window
+        if not logged:
+            self._counts[key] = (seen, suppressed + 1)
+            self.suppressed_total += 1
+            return None
+        self._counts[key] = (seen, 0)
+        self._logged_in_window += 1
+        return suppressed
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: str = "INFO", max_queue: int = 10000) -> DroppingQueueHandler:
+    """Route the root logger through a bounded queue to a JSON writer on a background thread"""
+    global _listener
+    shutdown_logging()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    log_queue: "queue.Queue" = queue.Queue(max_queue)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(TickContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, DroppingQueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    # httpx logs every request at INFO: one line per upstream call is too much per tick
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def shutdown_logging():
+    """Flush what is queued and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
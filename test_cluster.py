@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+
+from cluster import ClusterMembership, HashRing, SQLiteCoordinator
+
+KEYS = [f"ag_{i:05d}" for i in range(20000)]
+
+
+def owners(ring: HashRing):
+    return {key: ring.owner(key) for key in KEYS}
+
+
+def test_hash_ring():
+    """Test du HashRing : répartition et rééquilibrage"""
+    print("💍 Test du HashRing")
+    print("=" * 60)
+
+    # 1. Répartition : chaque worker reçoit à peu près sa part
+    print("\n1. ⚖️  Répartition des clés")
+    assert HashRing().owner("ag_1") is None
+    nodes = ["worker-a", "worker-b", "worker-c", "worker-d"]
+    ring = HashRing(nodes)
+    before = owners(ring)
+    for node in nodes:
+        share = sum(1 for owner in before.values() if owner == node) / len(KEYS)
+        print(f"   {node}: {share:.1%}")
+        assert 0.15 < share < 0.35, (node, share)
+    # Même anneau quel que soit l'ordre des workers
+    assert owners(HashRing(reversed(nodes))) == before
+    print("   ✅ Répartition équilibrée et déterministe")
+
+    # 2. Arrivée d'un worker : seules ses clés changent de propriétaire
+    print("\n2. ➕ Arrivée d'un worker")
+    after = owners(HashRing(nodes + ["worker-e"]))
+    moved = [key for key in KEYS if after[key] != before[key]]
+    assert all(after[key] == "worker-e" for key in moved)
+    assert 0.1 < len(moved) / len(KEYS) < 0.3
+    print(f"   ✅ {len(moved) / len(KEYS):.1%} des clés déplacées, toutes vers worker-e")
+
+    # 3. Départ d'un worker : seules ses clés sont redistribuées
+    print("\n3. ➖ Départ d'un worker")
+    after = owners(HashRing(["worker-a", "worker-b", "worker-d"]))
+    moved = [key for key in KEYS if after[key] != before[key]]
+    assert all(before[key] == "worker-c" for key in moved)
+    assert len(moved) == sum(1 for owner in before.values() if owner == "worker-c")
+    print(f"   ✅ Les {len(moved)} clés de worker-c redistribuées, aucune autre")
+
+    # 4. Deux workers partagent un coordinateur SQLite
+    print("\n4. 🤝 Rééquilibrage entre workers")
+    directory = tempfile.mkdtemp()
+    try:
+        coordinator = SQLiteCoordinator(os.path.join(directory, "cluster.db"))
+        first = ClusterMembership(coordinator, "worker-a")
+        second = ClusterMembership(coordinator, "worker-b")
+        first.refresh()
+        assert second.refresh() is True and first.refresh() is True
+        assert first.refresh() is False
+        owned = [(first.owns(key), second.owns(key)) for key in KEYS]
+        assert all(a != b for a, b in owned), "every key has exactly one owner"
+        print(f"   ✅ worker-a: {sum(a for a, _ in owned)} clés, worker-b: {sum(b for _, b in owned)} clés")
+        coordinator.leave("worker-b")
+        assert first.refresh() is True
+        assert all(first.owns(key) for key in KEYS)
+        assert first.rebalances == 2
+        print("   ✅ Après le départ de worker-b, worker-a reprend toutes les clés")
+        coordinator.close()
+    finally:
+        shutil.rmtree(directory)
+
+    print("\n🎉 Tous les tests terminés!")
+
+
+if __name__ == "__main__":
+    test_hash_ring()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import random
+
+from game_store import GameStateStore
+
+TYPES = ["say", "move", "emote", "idle"]
+TARGETS = [None, "North", "north", "ag_2", "Ag_2", ""]
+
+
+def rebuilt_indexes(store: GameStateStore):
+    """The type and target indexes as they should be, recomputed from the actions"""
+    by_type, by_target = {}, {}
+    for char_id, character in store.characters.items():
+        for action in character["actions"]:
+            GameStateStore._index_add(by_type, action.get("type"), char_id)
+            GameStateStore._index_add(by_target, GameStateStore._target_key(action), char_id)
+    return by_type, by_target
+
+
+def check_store(store: GameStateStore):
+    """Every index agrees with the characters and their actions"""
+    assert (store._by_type, store._by_target) == rebuilt_indexes(store)
+    assert store._order == sorted(store.characters)
+    assert set(store._recency) == set(store.characters)
+    assert store._aliases == {character["alias"]: char_id for char_id, character in store.characters.items()}
+    for character in store.characters.values():
+        assert len(character["actions"]) <= store.max_actions
+
+
+def check_queries(store: GameStateStore):
+    """Filtered and paginated reads match a brute-force scan"""
+    for action_type in [None] + TYPES:
+        for target in [None, "north", "AG_2", "nowhere"]:
+            expected = {}
+            for char_id in sorted(store.characters):
+                actions = [action for action in store.characters[char_id]["actions"]
+                           if (action_type is None or action["type"] == action_type)
+                           and (target is None or (action.get("target") or "").lower() == target.lower())]
+                if actions or (action_type is None and target is None):
+                    expected[char_id] = actions
+            characters, _ = store.query(action_type=action_type, target=target)
+            assert {char_id: character["actions"] for char_id, character in characters.items()} == expected
+            # Page after page, the same characters in the same order
+            paged, cursor = [], None
+            while True:
+                page, cursor = store.query(action_type=action_type, target=target, cursor=cursor, page_size=3)
+                paged.extend(page)
+                if cursor is None:
+                    break
+            assert paged == list(expected)
+
+
+def test_index_maintenance():
+    """Test des index du GameStateStore : insertion, troncature et suppression"""
+    print("🗂️  Test des index du GameStateStore")
+    print("=" * 60)
+    rng = random.Random(33)
+
+    # 1. Actions insérées puis tronquées à max_actions
+    print("\n1. ✂️  Troncature des actions")
+    store = GameStateStore(max_actions=5)
+    for char_id in [f"ag_{i}" for i in range(10)]:
+        store.ensure_character(char_id, char_id.upper())
+    for _ in range(2000):
+        char_id = f"ag_{rng.randrange(10)}"
+        store.add_action(char_id, {"type": rng.choice(TYPES), "target": rng.choice(TARGETS)})
+    check_store(store)
+    check_queries(store)
+    print("   ✅ Les index suivent les actions retirées par la troncature")
+
+    # 2. Suppressions, départs du roster et nouveaux personnages mélangés
+    print("\n2. 🧹 Suppressions et départs du roster")
+    removed = []
+    store.on_removed.append(removed.append)
+    for step in range(3000):
+        char_id = f"ag_{rng.randrange(15)}"
+        roll = rng.random()
+        if roll < 0.1:
+            store.ensure_character(char_id, char_id.upper())
+        elif roll < 0.15:
+            store.remove_character(char_id)
+        elif roll < 0.16:
+            store.sync_roster(c for c in store.characters if rng.random() < 0.8)
+        else:
+            store.add_action(char_id, {"type": rng.choice(TYPES), "target": rng.choice(TARGETS)})
+        if step % 100 == 0:
+            check_store(store)
+    check_store(store)
+    check_queries(store)
+    assert removed
+    print(f"   ✅ Index cohérents après {len(removed)} suppressions")
+
+    # 3. Éviction à max_characters : le moins récemment actif part
+    print("\n3. 📦 Éviction par capacité")
+    store = GameStateStore(max_actions=3, max_characters=4)
+    for i in range(4):
+        store.ensure_character(f"ag_{i}", f"AG_{i}")
+        store.add_action(f"ag_{i}", {"type": "say", "target": "north"})
+    store.add_action("ag_0", {"type": "move", "target": None})
+    assert store.ensure_character("ag_9", "AG_9", evict=False) is False
+    assert store.ensure_character("ag_9", "AG_9") is True
+    assert "ag_1" not in store.characters and store.evictions["capacity"] == 1
+    check_store(store)
+    print("   ✅ ag_1 évincé, ses actions retirées des index")
+
+    # 4. Inactivité : les personnages encore attendus restent, sauf pour faire de la place
+    print("\n4. 💤 Éviction des inactifs")
+    store = GameStateStore(max_actions=3, max_characters=4, idle_ttl=1e-9)
+    for i in range(4):
+        store.ensure_character(f"ag_{i}", f"AG_{i}")
+    assert store.evict_idle(keep=[f"ag_{i}" for i in range(4)]) == []
+    assert len(store.characters) == 4
+    evicted = store.evict_idle(keep=[f"ag_{i}" for i in range(6)])
+    assert len(evicted) == 2 and len(store.characters) == 2
+    assert store.evict_idle() and not store.characters
+    check_store(store)
+    print("   ✅ Aucun personnage attendu évincé sans nécessité")
+
+    print("\n🎉 Tous les tests terminés!")
+
+
+if __name__ == "__main__":
+    test_index_maintenance()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import shutil
+import tempfile
+
+from history import HistoryArchive
+
+CHARACTERS = [f"ag_{i}" for i in range(20)]
+
+
+def fill(archive: HistoryArchive, count: int, start: float = 1000.0):
+    """Append count random actions, one second apart; returns them as query() reports them"""
+    rng = random.Random(count)
+    expected = []
+    for i in range(count):
+        action = {
+            "type": rng.choice(["say", "move", "emote"]),
+            "target": rng.choice([None, "north", "ag_3"]),
+            "content": f"action {i % 37}",
+        }
+        char_id = rng.choice(CHARACTERS)
+        archive.append(char_id, action, timestamp=start + i)
+        expected.append({"timestamp": start + i, "character": char_id, **action})
+    return expected
+
+
+def check_queries(archive: HistoryArchive, expected):
+    """Compare time-range and per-character queries to a brute-force filter"""
+    assert list(archive.query()) == expected
+    for start, end in [(None, None), (1010.0, 1100.0), (1500.5, None), (None, 1003.0), (5000.0, None)]:
+        for character in [None, "ag_0", "ag_7", "nobody"]:
+            wanted = [record for record in expected
+                      if (start is None or record["timestamp"] >= start)
+                      and (end is None or record["timestamp"] < end)
+                      and (character is None or record["character"] == character)]
+            assert list(archive.query(start=start, end=end, character=character)) == wanted, \
+                (start, end, character)
+            assert list(archive.query(start=start, end=end, character=character, limit=5)) == wanted[:5]
+
+
+def test_history_archive():
+    """Test de l'archive d'historique : format sur disque et migration"""
+    print("📜 Test de l'archive d'historique")
+    print("=" * 60)
+    directory = tempfile.mkdtemp()
+    try:
+        # 1. Écriture et lecture
+        print("\n1. ✍️  Écriture et requêtes")
+        archive = HistoryArchive(directory)
+        expected = fill(archive, 2000)
+        check_queries(archive, expected)
+        assert archive.stats()["rows"] == 2000
+        print("   ✅ Requêtes par période et par personnage conformes")
+
+        # 2. Réouverture : le nombre de lignes et les chaînes de personnages sont relus du disque
+        print("\n2. 🔁 Réouverture")
+        archive.close()
+        archive = HistoryArchive(directory)
+        assert archive.count == 2000
+        check_queries(archive, expected)
+        expected += fill(archive, 500, start=3000.0)
+        check_queries(archive, expected)
+        print("   ✅ L'archive rouverte reprend là où elle s'était arrêtée")
+
+        # 3. Une seule archive ouverte par dossier
+        print("\n3. 🔒 Verrou exclusif")
+        try:
+            HistoryArchive(directory)
+        except RuntimeError as e:
+            print(f"   ✅ Second écrivain refusé: {e}")
+        else:
+            raise AssertionError("a second archive opened the same directory")
+
+        # 4. Migration d'une archive écrite avant strings.idx et la colonne prev
+        print("\n4. 🛠️  Migration de l'ancien format")
+        archive.close()
+        os.remove(os.path.join(directory, "strings.idx"))
+        os.remove(os.path.join(directory, "prev.col"))
+        archive = HistoryArchive(directory)
+        assert archive.strings.count == archive.stats()["strings"] > 0
+        check_queries(archive, expected)
+        archive.close()
+        # Une seule fois : les fichiers reconstruits sont réutilisés tels quels
+        archive = HistoryArchive(directory)
+        assert os.path.exists(os.path.join(directory, "strings.idx"))
+        assert not os.path.exists(os.path.join(directory, "prev.col.tmp"))
+        check_queries(archive, expected)
+        print("   ✅ Index des chaînes et chaînage par personnage reconstruits")
+
+        # 5. Ligne de trou : pas de personnage, le nombre d'actions perdues
+        print("\n5. 🕳️  Marqueur de trou")
+        archive.mark_gap(42, timestamp=9000.0)
+        gap = list(archive.query(start=9000.0))
+        assert gap == [{"timestamp": 9000.0, "character": None, "type": "gap", "target": None, "content": "42"}]
+        assert list(archive.query(start=9000.0, character="ag_0")) == []
+        archive.close()
+        print("   ✅ Trou visible dans l'historique complet, absent des requêtes par personnage")
+
+        print("\n🎉 Tous les tests terminés!")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_history_archive()
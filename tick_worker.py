@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+"""
+Headless tick worker for the distributed game loop
+
+Every worker started with the same coordinator database drives its share of the
+characters (consistent hashing of agent ids) and publishes its actions there;
+partitions rebalance as workers join or leave. Read the merged stream from any
+server started with the same GAME_CLUSTER_DB, at GET /cluster/actions.
+
+Usage: python tick_worker.py --db cluster.db [--id NAME] [--interval S] [--ttl S]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+
+
+async def run():
+    import fastapi_server as server
+    from structured_log import setup_logging
+
+    server.configure_game()
+    setup_logging(os.getenv("LOG_LEVEL", "INFO"))
+    server.start_cron_job()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await server.shutdown_event()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless tick worker for the distributed game loop")
+    parser.add_argument("--db", required=True, help="SQLite coordinator shared by the workers")
+    parser.add_argument("--id", default=None, help="Worker id (default: <hostname>-<pid>)")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between ticks")
+    parser.add_argument("--ttl", type=float, default=30.0, help="Seconds without heartbeat before a worker is dropped")
+    args = parser.parse_args()
+
+    os.environ["GAME_CLUSTER_DB"] = args.db
+    os.environ["GAME_TICK_INTERVAL"] = str(args.interval)
+    os.environ["GAME_CLUSTER_TTL"] = str(args.ttl)
+    worker_id = args.id or f"{os.uname().nodename}-{os.getpid()}"
+    os.environ["GAME_WORKER_ID"] = worker_id
+    # Each worker keeps its own archive: the column files have a single writer
+    os.environ.setdefault("GAME_HISTORY_DIR", os.path.join("game_history", "workers", worker_id))
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
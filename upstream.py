@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import httpx
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies, kept separately for each upstream route"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, route: str, seconds: float) -> None:
+        samples = self._samples.get(route)
+        if samples is None:
+            samples = self._samples[route] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, route: str, q: float) -> Optional[float]:
+        """Return the q-th quantile (0..1) for a route, or None until enough samples exist"""
+        samples = self._samples.get(route)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            route: {
+                "samples": len(samples),
+                "p50": self.percentile(route, 0.50),
+                "p95": self.percentile(route, 0.95),
+                "p99": self.percentile(route, 0.99),
+            }
+            for route, samples in self._samples.items()
+        }
+
+
+class RateBudget:
+    """Token bucket allowing rate requests per second on average (bursts up to burst); None: unlimited"""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self._tokens: Optional[float] = None
+        self._updated = time.monotonic()
+
+    def take(self) -> bool:
+        if not self.rate:
+            return True
+        capacity = self.burst or self.rate
+        now = time.monotonic()
+        if self._tokens is None:
+            self._tokens = capacity
+        self._tokens = min(capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+class UpstreamClient:
+    """
+    Shared HTTP client for the Mistral API.
+
+    Timeouts adapt to the observed p99 of each route instead of a fixed 30s, and
+    requests flagged with hedge=True send a backup attempt once the route's p95 has
+    elapsed. Hedges are paid for with a token bucket refilled by a fraction of
+    every request, so the extra load never exceeds hedge_budget.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        *,
+        default_timeout: float = 30.0,
+        min_timeout: float = 2.0,
+        max_timeout: float = 30.0,
+        timeout_multiplier: float = 3.0,
+        hedge_budget: float = 0.1,
+        hedge_min_delay: float = 0.05,
+        max_connections: int = 100,
+        tracker: Optional[LatencyTracker] = None,
+        wrap_transport: Optional[Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]] = None,
+    ):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge_budget = hedge_budget
+        self.hedge_min_delay = hedge_min_delay
+        self.tracker = tracker or LatencyTracker()
+
+        self._hedge_tokens = 0.0
+        self._hedge_tokens_max = 10.0
+        self.requests_sent = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        # wrap_transport lets the traffic be recorded or replayed (see replay.py)
+        transport = wrap_transport(httpx.AsyncHTTPTransport(limits=limits)) if wrap_transport else None
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=default_timeout,
+            limits=limits
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Underlying connection pool, for SDK clients that should share it"""
+        return self._client
+
+    def timeout_for(self, route: str) -> float:
+        """Adaptive timeout: a multiple of the route's p99, clamped to [min_timeout, max_timeout]"""
+        p99 = self.tracker.percentile(route, 0.99)
+        if p99 is None:
+            return self.default_timeout
+        return max(self.min_timeout, min(self.max_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self, route: str) -> Optional[float]:
+        """Delay before a backup request is sent, or None while the route has no p95 yet"""
+        p95 = self.tracker.percentile(route, 0.95)
+        if p95 is None:
+            return None
+        return max(self.hedge_min_delay, p95)
+
+    def _take_hedge_token(self) -> bool:
+        if self._hedge_tokens >= 1.0:
+            self._hedge_tokens -= 1.0
+            return True
+        return False
+
+    async def _attempt(self, method: str, path: str, route: str, timeout: float, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(method, path, timeout=timeout, **kwargs)
+        except httpx.TimeoutException:
+            # A timeout is a lower bound on the real latency; recording it lets the
+            # percentiles (and therefore the timeout) grow when the upstream slows down
+            self.tracker.record(route, timeout)
+            raise
+        self.tracker.record(route, time.perf_counter() - started)
+        return response
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        route: Optional[str] = None,
+        hedge: bool = False,
+        **kwargs
+    ) -> httpx.Response:
+        route = f"{method.upper()} {route or path}"
+        timeout = self.timeout_for(route)
+
+        self.requests_sent += 1
+        self._hedge_tokens = min(self._hedge_tokens_max, self._hedge_tokens + self.hedge_budget)
+
+        delay = self.hedge_delay(route) if hedge and self.hedge_budget > 0 else None
+        if delay is None:
+            return await self._attempt(method, path, route, timeout, **kwargs)
+
+        primary = asyncio.ensure_future(self._attempt(method, path, route, timeout, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._take_hedge_token():
+            return await primary
+
+        self.hedges_sent += 1
+        backup = asyncio.ensure_future(self._attempt(method, path, route, timeout, **kwargs))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    if backup in winners and primary not in winners:
+                        self.hedges_won += 1
+                    return winners[0].result()
+                if not pending:
+                    raise done.pop().exception()
+        finally:
+            for task in (primary, backup):
+                if not task.done():
+                    task.cancel()
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", path, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_sent": self.requests_sent,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "routes": {
+                route: {**values, "timeout": self.timeout_for(route)}
+                for route, values in self.tracker.stats().items()
+            }
+        }
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
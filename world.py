@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+import re
+import zlib
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+Position = Tuple[int, int]
+
+DIRECTIONS: Dict[str, Position] = {
+    "north": (0, 1),
+    "south": (0, -1),
+    "east": (1, 0),
+    "west": (-1, 0),
+    "northeast": (1, 1),
+    "northwest": (-1, 1),
+    "southeast": (1, -1),
+    "southwest": (-1, -1),
+    "up": (0, 1),
+    "down": (0, -1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+_DIRECTION_PATTERN = re.compile(
+    r"\b(north|south)[\s-]?(east|west)\b|\b(north|south|east|west|up|down|left|right)\b"
+)
+
+
+def parse_direction(*texts: Optional[str]) -> Optional[Position]:
+    """Unit step of the first direction named in texts (the move target, then its description)"""
+    for text in texts:
+        if not text:
+            continue
+        match = _DIRECTION_PATTERN.search(text.lower())
+        if match:
+            if match.group(1):
+                return DIRECTIONS[match.group(1) + match.group(2)]
+            return DIRECTIONS[match.group(3)]
+    return None
+
+
+class SpatialGrid:
+    """
+    Uniform-grid spatial index.
+
+    Points are bucketed into square cells of cell_size; a query only visits the
+    cells overlapping its area, so its cost is the number of points found plus
+    a bounded number of cells, independent of the total population.
+    """
+
+    def __init__(self, cell_size: int = 16):
+        self.cell_size = cell_size
+        self.positions: Dict[str, Position] = {}
+        self.cells: Dict[Position, Set[str]] = {}
+
+    def _cell(self, x: int, y: int) -> Position:
+        return (x // self.cell_size, y // self.cell_size)
+
+    def place(self, key: str, x: int, y: int):
+        old = self.positions.get(key)
+        cell = self._cell(x, y)
+        if old is not None:
+            old_cell = self._cell(*old)
+            if old_cell == cell:
+                self.positions[key] = (x, y)
+                return
+            self._discard(old_cell, key)
+        self.positions[key] = (x, y)
+        self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: str):
+        old = self.positions.pop(key, None)
+        if old is not None:
+            self._discard(self._cell(*old), key)
+
+    def _discard(self, cell: Position, key: str):
+        members = self.cells.get(cell)
+        if members is not None:
+            members.discard(key)
+            if not members:
+                del self.cells[cell]
+
+    def _cells_in(self, x_min: int, y_min: int, x_max: int, y_max: int) -> Iterator[Set[str]]:
+        cx_min, cy_min = self._cell(x_min, y_min)
+        cx_max, cy_max = self._cell(x_max, y_max)
+        span = (cx_max - cx_min + 1) * (cy_max - cy_min + 1)
+        if span > len(self.cells):
+            # Sparse world, huge area: walking the occupied cells is cheaper
+            for (cx, cy), members in self.cells.items():
+                if cx_min <= cx <= cx_max and cy_min <= cy <= cy_max:
+                    yield members
+            return
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                members = self.cells.get((cx, cy))
+                if members:
+                    yield members
+
+    def query_rect(self, x_min: int, y_min: int, x_max: int, y_max: int) -> Iterator[str]:
+        positions = self.positions
+        for members in self._cells_in(x_min, y_min, x_max, y_max):
+            for key in members:
+                x, y = positions[key]
+                if x_min <= x <= x_max and y_min <= y <= y_max:
+                    yield key
+
+    def neighbors(self, key: str, radius: int, limit: Optional[int] = None) -> List[str]:
+        """Other points within radius (euclidean) of key, nearest first"""
+        center = self.positions.get(key)
+        if center is None:
+            return []
+        cx, cy = center
+        radius_sq = radius * radius
+        found = []
+        for other in self.query_rect(cx - radius, cy - radius, cx + radius, cy + radius):
+            if other == key:
+                continue
+            ox, oy = self.positions[other]
+            distance_sq = (ox - cx) ** 2 + (oy - cy) ** 2
+            if distance_sq <= radius_sq:
+                found.append((distance_sq, other))
+        found.sort()
+        if limit is not None:
+            found = found[:limit]
+        return [other for _, other in found]
+
+
+class World:
+    """
+    Character positions, driven by move actions.
+
+    Characters spawn at a stable pseudo-random spot (derived from their id)
+    inside a square of spawn_size, and move step units per move action in the
+    direction it names. Moves without a recognizable direction leave the
+    character in place.
+    """
+
+    def __init__(self, spawn_size: int = 200, step: int = 2, view_radius: int = 10,
+                 max_neighbors: int = 8, cell_size: int = 16):
+        self.spawn_size = spawn_size
+        self.step = step
+        self.view_radius = view_radius
+        self.max_neighbors = max_neighbors
+        self.grid = SpatialGrid(cell_size)
+        self.names: Dict[str, str] = {}
+        self.moves = 0
+
+    def spawn(self, char_id: str, name: str):
+        self.names[char_id] = name
+        if char_id not in self.grid.positions:
+            seed = zlib.crc32(char_id.encode())
+            half = self.spawn_size // 2
+            x = seed % self.spawn_size - half
+            y = (seed // self.spawn_size) % self.spawn_size - half
+            self.grid.place(char_id, x, y)
+
+    def remove(self, char_id: str):
+        self.names.pop(char_id, None)
+        self.grid.remove(char_id)
+
+    def position(self, char_id: str) -> Optional[Position]:
+        return self.grid.positions.get(char_id)
+
+    def apply_move(self, char_id: str, target: Optional[str], content: Optional[str]) -> Optional[Position]:
+        """Move a character per a move action; returns its new position, or None if it stayed"""
+        position = self.grid.positions.get(char_id)
+        direction = parse_direction(target, content)
+        if position is None or direction is None:
+            return None
+        x = position[0] + direction[0] * self.step
+        y = position[1] + direction[1] * self.step
+        self.grid.place(char_id, x, y)
+        self.moves += 1
+        return (x, y)
+
+    def nearby(self, char_id: str) -> List[str]:
+        return self.grid.neighbors(char_id, self.view_radius, self.max_neighbors)
+
+    def nearby_names(self, char_id: str) -> List[str]:
+        return [self.names.get(other, other) for other in self.nearby(char_id)]
+
+    def region(self, x_min: int, y_min: int, x_max: int, y_max: int,
+               limit: Optional[int] = None) -> List[Dict[str, object]]:
+        found = []
+        for char_id in self.grid.query_rect(x_min, y_min, x_max, y_max):
+            x, y = self.grid.positions[char_id]
+            found.append({"id": char_id, "name": self.names.get(char_id, char_id), "x": x, "y": y})
+            if limit is not None and len(found) >= limit:
+                break
+        return found
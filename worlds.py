@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import asyncio
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from game_store import GameStateStore
+from history import HistoryArchive
+from memory import MemoryBank
+from pregen import ActionQueues
+from scheduler import InterestScheduler
+from world import World
+
+WORLD_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class GameWorld:
+    """
+    One named game world.
+
+    A world has its own member agents (None: every agent of the roster), its
+    own state store, memories, update schedule, positions and pre-generated
+    action queues, and its own tick interval and concurrency budget for action
+    calls. Each world is ticked by its own loop, so a heavy world only slows
+    itself down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        members: Optional[Iterable[str]] = None,
+        tick_interval: float = 5.0,
+        max_concurrency: Optional[int] = None,
+        store: Optional[GameStateStore] = None,
+        memory: Optional[MemoryBank] = None,
+        scheduler: Optional[InterestScheduler] = None,
+        world: Optional[World] = None,
+        queues: Optional[ActionQueues] = None,
+    ):
+        if not WORLD_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid world name '{name}' (letters, digits, '-' and '_', at most 64)")
+        self.name = name
+        self.members: Optional[Set[str]] = set(members) if members is not None else None
+        self.tick_interval = tick_interval
+        self.max_concurrency = max_concurrency
+        self.store = store or GameStateStore(max_actions=10)
+        self.memory = memory or MemoryBank()
+        self.scheduler = scheduler or InterestScheduler()
+        self.world = world or World()
+        self.queues = queues or ActionQueues()
+        if store is None:
+            self.store.on_added.extend([self.memory.register, self.world.spawn])
+            self.store.on_removed.extend([self.memory.forget, self.scheduler.forget, self.world.remove,
+                                          self.queues.forget])
+
+        self.archive: Optional[HistoryArchive] = None
+        self.task: Optional[asyncio.Task] = None
+        self.running = False
+        self.ticks = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_size: Optional[int] = None
+
+    def includes(self, agent_id: str) -> bool:
+        return self.members is None or agent_id in self.members
+
+    def select_agents(self, roster_agents: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.members is None:
+            return list(roster_agents.values())
+        return [roster_agents[agent_id] for agent_id in self.members if agent_id in roster_agents]
+
+    @property
+    def semaphore(self) -> Optional[asyncio.Semaphore]:
+        """Bounds this world's concurrent action calls (None: unbounded)"""
+        if not self.max_concurrency:
+            return None
+        if self._semaphore is None or self._semaphore_size != self.max_concurrency:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_size = self.max_concurrency
+        return self._semaphore
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "members": sorted(self.members) if self.members is not None else None,
+            "tick_interval": self.tick_interval,
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "ticks": self.ticks,
+            "characters_count": len(self.store.characters),
+            "last_update": self.store.last_update,
+        }
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.running = False
+        self.queues.close()
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None